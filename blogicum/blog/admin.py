@@ -1,5 +1,78 @@
 from django.contrib import admin
-from .models import Category, Location, Post, Comment
+from django.contrib.admin.widgets import AutocompleteSelect
+
+from .models import Category, Comment, ImageJob, Location, Post
+from .pagination import EstimatedCountPaginator
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """Фильтр по связи с полем автодополнения вместо списка всех объектов.
+
+    Варианты подгружаются представлением ``admin:autocomplete``, поэтому
+    у админки связанной модели должны быть ``search_fields``.
+    """
+
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(
+            field, request, params, model, model_admin, field_path
+        )
+        form_field = field.formfield(
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+        self.rendered_widget = form_field.widget.render(
+            self.lookup_kwarg, self.lookup_val,
+            attrs={'id': f'filter_{self.lookup_kwarg}', 'style': 'width: 100%'}
+        )
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(
+                remove=[self.lookup_kwarg, self.lookup_kwarg_isnull]
+            ),
+            'lookup_kwarg': self.lookup_kwarg,
+            'widget': self.rendered_widget,
+        }
+
+
+class ScalableChangeListMixin:
+    """Общие настройки списков, где строк много."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        return super().media + AutocompleteSelect(None, self.admin_site).media
+
+    def get_changelist_form(self, request, **kwargs):
+        """Варианты редактируемых в списке связей читаются один раз.
+
+        Иначе каждая строка списка выполняет свой запрос к связанной
+        таблице при отрисовке ``<select>``.
+        """
+        form_class = super().get_changelist_form(request, **kwargs)
+        cached_choices = {}
+
+        class ChangeListForm(form_class):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                for name, field in self.fields.items():
+                    if hasattr(field, 'queryset'):
+                        if name not in cached_choices:
+                            cached_choices[name] = list(field.choices)
+                        field.choices = cached_choices[name]
+
+        return ChangeListForm
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -17,20 +90,34 @@ class LocationAdmin(admin.ModelAdmin):
     search_fields = ('name',)
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(ScalableChangeListMixin, admin.ModelAdmin):
     list_display = (
         'title', 'author', 'category', 'location',
-        'is_published', 'pub_date'
+        'is_published', 'visibility', 'pub_date'
     )
     list_editable = ('is_published', 'category')
-    list_filter = ('is_published', 'category', 'author', 'location')
+    list_filter = (
+        'is_published',
+        'visibility',
+        'category',
+        ('author', AutocompleteFilter),
+        ('location', AutocompleteFilter),
+    )
+    list_select_related = ('author', 'category', 'location')
+    autocomplete_fields = ('author', 'location')
     search_fields = ('title', 'text')
     date_hierarchy = 'pub_date'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableChangeListMixin, admin.ModelAdmin):
     list_display = ('author', 'post', 'short_text', 'created_at')
-    list_filter = ('created_at', 'author', 'post')
+    list_filter = (
+        'created_at',
+        ('author', AutocompleteFilter),
+        ('post', AutocompleteFilter),
+    )
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('post',)
     search_fields = ('text', 'author__username', 'post__title')
     readonly_fields = ('created_at',)
     list_per_page = 20
@@ -58,7 +145,14 @@ class CommentAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('image_name', 'post', 'attempts', 'created_at')
+    list_select_related = ('post',)
+    readonly_fields = ('post', 'image_name', 'attempts', 'last_error')
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ImageJob, ImageJobAdmin)
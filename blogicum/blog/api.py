@@ -0,0 +1,213 @@
+"""Read-only JSON API для мобильного клиента.
+
+Списки отдаются постранично по курсору (``?cursor=``, ``?limit=``),
+поля выбираются параметром ``?fields=id,title``. Ответ сериализуется
+по одной записи в ``StreamingHttpResponse`` и сжимается gzip.
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import BadRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
+from django.views import View
+from django.views.decorators.gzip import gzip_page
+
+from .models import Category, Comment, Post
+from .pagination import CursorPaginator
+from .references import get_references
+from .views import VisiblePostMixin
+
+User = get_user_model()
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def _dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def _category(post):
+    if post.category is None:
+        return None
+    return {'slug': post.category.slug, 'title': post.category.title}
+
+
+def _location(post):
+    location = post.location
+    return location.name if location and location.is_published else None
+
+
+POST_FIELDS = {
+    'id': lambda post: post.id,
+    'url': lambda post: reverse('blog:api_post', args=(post.id,)),
+    'title': lambda post: post.title,
+    'excerpt': lambda post: post.excerpt,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date,
+    'updated_at': lambda post: post.updated_at,
+    'author': lambda post: post.author.username,
+    'category': _category,
+    'location': _location,
+    'image': lambda post: post.image.url if post.image else None,
+    'comments_count': lambda post: post.comments_count,
+}
+
+COMMENT_FIELDS = {
+    'id': lambda comment: comment.id,
+    'text': lambda comment: comment.text,
+    'author': lambda comment: comment.author.username,
+    'created_at': lambda comment: comment.created_at,
+}
+
+CATEGORY_FIELDS = {
+    'slug': lambda category: category.slug,
+    'title': lambda category: category.title,
+    'description': lambda category: category.description,
+    'posts_url': lambda category: reverse(
+        'blog:api_category_posts', args=(category.slug,)
+    ),
+}
+
+
+@method_decorator(gzip_page, name='dispatch')
+class ApiView(View):
+    http_method_names = ['get', 'head', 'options']
+    serializers = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404 as error:
+            return JsonResponse({'detail': str(error)}, status=404)
+        except BadRequest as error:
+            return JsonResponse({'detail': str(error)}, status=400)
+
+    @cached_property
+    def fields(self):
+        """Поля из ``?fields=``; по умолчанию — все."""
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return tuple(self.serializers)
+        fields = tuple(dict.fromkeys(
+            field.strip() for field in requested.split(',') if field.strip()
+        ))
+        unknown = set(fields) - set(self.serializers)
+        if unknown:
+            raise BadRequest(
+                'Неизвестные поля: ' + ', '.join(sorted(unknown))
+            )
+        return fields
+
+    def serialize(self, obj):
+        return {field: self.serializers[field](obj) for field in self.fields}
+
+
+class ApiListView(ApiView):
+    ordering = ('-pub_date', '-id')
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            raise BadRequest('limit должен быть числом.')
+        return min(max(limit, 1), MAX_LIMIT)
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return self.request.build_absolute_uri('?' + query.urlencode())
+
+    def get(self, request, *args, **kwargs):
+        # Ошибки параметров должны стать ответом 400 до того, как
+        # потоковый ответ отправит заголовки 200.
+        self.fields
+        paginator = CursorPaginator(
+            self.get_queryset(), self.get_limit(), ordering=self.ordering
+        )
+        page = paginator.page(request.GET.get('cursor'))
+        return StreamingHttpResponse(
+            self.stream(page), content_type='application/json'
+        )
+
+    def stream(self, page):
+        yield '{{"next":{},"previous":{},"results":['.format(
+            _dumps(self.page_url(page.next_cursor)),
+            _dumps(self.page_url(page.previous_cursor)),
+        )
+        for index, obj in enumerate(page):
+            yield (',' if index else '') + _dumps(self.serialize(obj))
+        yield ']}'
+
+
+class PostFieldsMixin:
+    serializers = POST_FIELDS
+
+    def with_fields(self, queryset):
+        queryset = queryset.for_list()
+        if 'text' in self.fields:
+            queryset = queryset.defer(None)
+        return queryset
+
+
+class PostListApiView(PostFieldsMixin, ApiListView):
+    def get_queryset(self):
+        return self.with_fields(Post.objects.published())
+
+
+class CategoryPostsApiView(PostFieldsMixin, ApiListView):
+    def get_queryset(self):
+        category = get_references().published_category(
+            self.kwargs['category_slug']
+        )
+        if category is None:
+            raise Http404('Категория не найдена.')
+        return self.with_fields(
+            Post.objects.published().filter(category=category)
+        )
+
+
+class ProfilePostsApiView(PostFieldsMixin, ApiListView):
+    def get_queryset(self):
+        author = get_object_or_404(User, username=self.kwargs['username'])
+        queryset = Post.objects.filter(author=author)
+        if self.request.user.pk != author.pk:
+            queryset = queryset.published()
+        return self.with_fields(queryset)
+
+
+class CategoryListApiView(ApiListView):
+    serializers = CATEGORY_FIELDS
+    ordering = ('id',)
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+
+class PostApiView(VisiblePostMixin, PostFieldsMixin, ApiView):
+    def get(self, request, *args, **kwargs):
+        post = self.get_visible_post(self.with_fields(Post.objects.all()))
+        return JsonResponse(
+            self.serialize(post), encoder=DjangoJSONEncoder,
+            json_dumps_params={'ensure_ascii': False},
+        )
+
+
+class CommentListApiView(VisiblePostMixin, ApiListView):
+    serializers = COMMENT_FIELDS
+    ordering = ('created_at', 'id')
+
+    def get_queryset(self):
+        post = self.get_visible_post(
+            Post.objects.only('id', 'author_id', 'visibility', 'pub_date')
+        )
+        return Comment.objects.filter(post=post).select_related('author')
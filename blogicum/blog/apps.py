@@ -5,3 +5,9 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from . import signals, sqlite  # noqa: F401
+        from .cache import check_page_cache
+
+        check_page_cache()
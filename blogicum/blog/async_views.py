@@ -0,0 +1,91 @@
+"""Асинхронные варианты читающих страниц для запуска под ASGI.
+
+Синхронное представление ASGI-обработчик Django выполняет через
+``sync_to_async(thread_sensitive=True)``, то есть в одном общем потоке:
+одновременные запросы встают в очередь друг за другом. Здесь
+представление вместе с отрисовкой шаблона уходит в ограниченный пул
+потоков ``BLOG_ASYNC_VIEW_THREADS``, а цикл событий остаётся свободным.
+Асинхронного ORM в Django 3.2 нет, поэтому вся работа с базой идёт в
+потоках пула; у каждого потока своё соединение, которое закрывается по
+правилам ``CONN_MAX_AGE``, как после запроса под WSGI.
+
+Под WSGI эти представления не используются: URL-схема
+``blogicum.urls_async`` подключается только в ``blogicum.asgi``.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial, update_wrapper
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+from .middleware import QueryStats, count_queries
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.BLOG_ASYNC_VIEW_THREADS,
+        thread_name_prefix='blog-view',
+    )
+
+
+def _with_connections(func, *args, **kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Выполняет синхронную функцию (обычно — с запросами к базе) в пуле.
+
+    Функция видит контекстные переменные запроса, например выбранную
+    для чтения базу (см. ``blog.routers``).
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(),
+        partial(context.run, _with_connections, func, *args, **kwargs),
+    )
+
+
+def _call_view(view, request, *args, **kwargs):
+    stats = getattr(request, 'query_stats', None) or QueryStats()
+    with count_queries(stats):
+        response = view(request, *args, **kwargs)
+        # Отложенный ответ отрисовывается здесь же, иначе обработчик
+        # отрисует его в общем потоке.
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+    return response
+
+
+async def run_in_pool(view, request, *args, **kwargs):
+    return await run_sync(_call_view, view, request, *args, **kwargs)
+
+
+def as_async_view(view):
+    """Оборачивает синхронную функцию представления в корутину."""
+    async def async_view(request, *args, **kwargs):
+        return await run_in_pool(view, request, *args, **kwargs)
+
+    return update_wrapper(async_view, view)
+
+
+def replace_views(urlpatterns, views):
+    """Копия ``urlpatterns`` с асинхронными представлениями для ``views``."""
+    return [
+        URLPattern(
+            pattern.pattern,
+            as_async_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        if getattr(pattern, 'name', None) in views else pattern
+        for pattern in urlpatterns
+    ]
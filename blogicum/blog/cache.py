@@ -0,0 +1,148 @@
+"""Кеш готовых страниц лент для анонимных посетителей.
+
+Страница сбрасывается двумя способами. Ключ страницы содержит версию
+её области (главная, категория, профиль), и правка, меняющая состав
+ленты, записывает новую версию. Вместе со страницей хранятся версии
+показанных на ней публикаций; правка публикации увеличивает её версию
+через ``cache.incr``, и страница с другой версией считается устаревшей.
+
+Сброс виден другим процессам сервера, только если кеш у них общий:
+с ``LocMemCache`` при ``BLOG_SERVER_PROCESSES > 1`` приложение не
+запустится.
+"""
+import hashlib
+from random import randrange
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import QueryDict
+
+from .routers import current_read_database
+
+INDEX_SCOPE = 'index'
+
+# Бэкенды кеша, которые не видят другие процессы.
+PROCESS_CACHE_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_process_local(cache):
+    return isinstance(cache, PROCESS_CACHE_BACKENDS)
+
+
+def page_cache():
+    return caches[settings.BLOG_PAGE_CACHE_ALIAS]
+
+
+def check_page_cache():
+    """Не даёт запустить несколько процессов с кешем страниц в памяти."""
+    if settings.BLOG_SERVER_PROCESSES > 1 and is_process_local(page_cache()):
+        raise ImproperlyConfigured(
+            f'BLOG_PAGE_CACHE_ALIAS={settings.BLOG_PAGE_CACHE_ALIAS!r}: '
+            'кеш в памяти процесса не годится при '
+            f'BLOG_SERVER_PROCESSES={settings.BLOG_SERVER_PROCESSES}, '
+            'правки не сбросят страницы в других процессах. Укажите общий '
+            'кеш (Memcached, Redis, файловый).'
+        )
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def profile_scope(username):
+    return f'profile:{username}'
+
+
+def _version_key(scope):
+    return f'blog:page-version:{scope}'
+
+
+def _post_version_key(post_id):
+    return f'blog:post-version:{post_id}'
+
+
+def _scope_version(scope):
+    return page_cache().get_or_set(_version_key(scope), uuid4().hex, None)
+
+
+def page_path(request, params=()):
+    """Путь страницы только с теми параметрами, которые читает представление.
+
+    Остальные параметры на страницу не влияют; попади они в ключ, любой
+    ``?x=1``, ``?x=2``… заводил бы новую запись и вытеснял настоящие
+    страницы. Представления читают последнее значение параметра.
+    """
+    query = QueryDict(mutable=True)
+    for name in params:
+        if name in request.GET:
+            query[name] = request.GET[name]
+    if not query:
+        return request.path
+    return f'{request.path}?{query.urlencode()}'
+
+
+def page_key(scope, path):
+    digest = hashlib.md5(path.encode()).hexdigest()
+    return f'blog:page:{scope}:{_scope_version(scope)}:{digest}'
+
+
+def _post_versions(post_ids):
+    cache = page_cache()
+    keys = [_post_version_key(post_id) for post_id in post_ids]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        # add() не затрёт версию, которую успел записать другой процесс.
+        # Случайное начало: вытесненная и заведённая заново версия не
+        # совпадёт с версией страниц, сохранённых до вытеснения.
+        cache.add(key, randrange(1 << 31), None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def get_page(key):
+    """Страница из кеша или ``None``, если её публикации с тех пор менялись."""
+    cache = page_cache()
+    page = cache.get(key)
+    if page is None:
+        return None
+    versions = page['post_versions']
+    if versions and cache.get_many(list(versions)) != versions:
+        return None
+    return page['content']
+
+
+def store_page(key, content, post_ids):
+    """Сохраняет страницу вместе с версиями её публикаций.
+
+    Страница, прочитанная с реплики, могла отстать от уже сброшенной
+    записи, поэтому она живёт не дольше ``BLOG_REPLICA_STICKY_SECONDS``.
+    """
+    timeout = settings.BLOG_PAGE_CACHE_TIMEOUT
+    if current_read_database() is not None:
+        timeout = min(timeout, settings.BLOG_REPLICA_STICKY_SECONDS)
+    page_cache().set(key, {
+        'content': content,
+        'post_versions': _post_versions(post_ids),
+    }, timeout)
+
+
+def invalidate_scopes(*scopes):
+    page_cache().set_many(
+        {_version_key(scope): uuid4().hex for scope in scopes}, None
+    )
+
+
+def invalidate_post_pages(post_ids):
+    cache = page_cache()
+    for post_id in post_ids:
+        try:
+            cache.incr(_post_version_key(post_id))
+        except ValueError:
+            # Версии нет: ни одна сохранённая страница на неё не опирается.
+            pass
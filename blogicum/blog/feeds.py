@@ -0,0 +1,190 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe, quote_etag
+
+from . import cache
+from .models import Post
+from .references import get_references
+
+User = get_user_model()
+FEED_SIZE = 20
+
+
+class PostFeed(Feed):
+    """Лента последних опубликованных записей.
+
+    Готовый XML лежит в кеше страниц в той же области, что и HTML-лента,
+    поэтому сбрасывается теми же сигналами. Вместе с ним хранятся ETag и
+    Last-Modified: опрос без изменений получает 304 без запросов к базе.
+    Экземпляр создаётся на каждый запрос (см. ``as_view``): в нём
+    запоминаются публикации, попавшие в ленту.
+    """
+
+    cached_headers = ('Content-Type', 'ETag', 'Last-Modified')
+    read_from_replica = True
+
+    @classmethod
+    def as_view(cls):
+        def view(request, *args, **kwargs):
+            return cls()(request, *args, **kwargs)
+
+        view.view_class = cls
+        return view
+
+    def get_cache_scope(self, **kwargs):
+        raise NotImplementedError
+
+    def get_queryset(self, obj):
+        return Post.objects.published()
+
+    def __call__(self, request, *args, **kwargs):
+        # Лента не читает параметры запроса.
+        key = cache.page_key(
+            self.get_cache_scope(**kwargs), cache.page_path(request)
+        )
+        page = cache.get_page(key)
+        if page is None:
+            self.posts = []
+            response = super().__call__(request, *args, **kwargs)
+            response['ETag'] = quote_etag(
+                hashlib.md5(response.content).hexdigest()
+            )
+            page = {
+                'content': response.content,
+                'headers': {
+                    header: response[header]
+                    for header in self.cached_headers
+                    if response.has_header(header)
+                },
+            }
+            cache.store_page(key, page, [post.id for post in self.posts])
+        response = HttpResponse(page['content'])
+        for header, value in page['headers'].items():
+            response[header] = value
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')
+            ),
+            response=response,
+        )
+
+    def get_object(self, request, *args, **kwargs):
+        self.object = self.get_feed_object(**kwargs)
+        return self.object
+
+    def get_feed_object(self, **kwargs):
+        return None
+
+    def items(self, obj):
+        self.posts = list(
+            self.get_queryset(obj)
+            .for_list()
+            .order_by('-pub_date', '-id')[:FEED_SIZE]
+        )
+        return self.posts
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return post.excerpt
+
+    def item_link(self, post):
+        return reverse('blog:post_detail', args=(post.id,))
+
+    def item_author_name(self, post):
+        return post.author.username
+
+    def item_author_link(self, post):
+        return reverse('blog:profile', args=(post.author.username,))
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_categories(self, post):
+        return [post.category.title] if post.category else []
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class IndexFeed(PostFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума.'
+
+    def get_cache_scope(self, **kwargs):
+        return cache.INDEX_SCOPE
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryFeed(PostFeed):
+    def get_cache_scope(self, category_slug):
+        return cache.category_scope(category_slug)
+
+    def get_feed_object(self, category_slug):
+        category = get_references().published_category(category_slug)
+        if category is None:
+            raise Http404('Категория не найдена.')
+        return category
+
+    def get_queryset(self, category):
+        return super().get_queryset(category).filter(category=category)
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=(category.slug,))
+
+
+class AuthorFeed(PostFeed):
+    def get_cache_scope(self, username):
+        return cache.profile_scope(username)
+
+    def get_feed_object(self, username):
+        return get_object_or_404(User, username=username)
+
+    def get_queryset(self, author):
+        return super().get_queryset(author).filter(author=author)
+
+    def title(self, author):
+        return f'Блогикум: @{author.username}'
+
+    def description(self, author):
+        return f'Публикации пользователя {author.username}.'
+
+    def link(self, author):
+        return reverse('blog:profile', args=(author.username,))
+
+
+class IndexAtomFeed(AtomFeedMixin, IndexFeed):
+    pass
+
+
+class CategoryAtomFeed(AtomFeedMixin, CategoryFeed):
+    pass
+
+
+class AuthorAtomFeed(AtomFeedMixin, AuthorFeed):
+    pass
@@ -0,0 +1,210 @@
+import logging
+import os
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import cache
+from .models import ImageJob, Post
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = (320, 640, 1280)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True}),
+}
+DEFAULT_RENDITION_WIDTH = 640
+REENCODE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+}
+JOB_LEASE = timedelta(minutes=5)
+JOB_MAX_ATTEMPTS = 3
+
+
+def rendition_name(name, width, fmt):
+    stem, _ = os.path.splitext(name)
+    return f'{stem}_{width}w.{RENDITION_FORMATS[fmt][1]}'
+
+
+def rendition_names(name):
+    return [
+        rendition_name(name, width, fmt)
+        for width in RENDITION_WIDTHS
+        for fmt in RENDITION_FORMATS
+    ]
+
+
+def _encode(image, fmt):
+    pil_format, _, options = RENDITION_FORMATS[fmt]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def build_renditions(image_file):
+    """Сохраняет рядом с картинкой уменьшенные копии в WebP и JPEG.
+
+    Картинки меньше нужной ширины не растягиваются: копия сохраняется в
+    исходном размере, чтобы у каждой картинки был полный набор файлов.
+    """
+    storage = image_file.storage
+    with storage.open(image_file.name, 'rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+    for width in RENDITION_WIDTHS:
+        resized = original.copy()
+        resized.thumbnail((width, width * 10))
+        for fmt in RENDITION_FORMATS:
+            name = rendition_name(image_file.name, width, fmt)
+            storage.delete(name)
+            storage.save_derived(name, _encode(resized, fmt))
+
+
+def delete_renditions(storage, name):
+    for rendition in rendition_names(name):
+        storage.delete(rendition)
+
+
+def strip_and_reencode(image_file):
+    """Перекодирует оригинал без EXIF, повернув его по ориентации.
+
+    Результат сохраняется новым файлом, исходный не трогается: на него
+    могут ссылаться другие публикации. Возвращает имя нового файла.
+    """
+    storage = image_file.storage
+    with storage.open(image_file.name, 'rb') as source:
+        original = Image.open(source)
+        pil_format = original.format
+        if pil_format not in REENCODE_OPTIONS:
+            return image_file.name
+        cleaned = ImageOps.exif_transpose(original)
+        cleaned.load()
+    if pil_format == 'JPEG' and cleaned.mode != 'RGB':
+        cleaned = cleaned.convert('RGB')
+    buffer = BytesIO()
+    cleaned.save(buffer, pil_format, **REENCODE_OPTIONS[pil_format])
+    return storage.save_replacement(
+        image_file.name, ContentFile(buffer.getvalue())
+    )
+
+
+def release_image(name, since=None):
+    """Удаляет файл и его копии, если на него не ссылается ни одна публикация.
+
+    Одинаковые картинки хранятся одним файлом, поэтому число ссылок —
+    это число публикаций с таким ``image``. Файл, сохранённый заново
+    после ``since`` (повторная загрузка тех же байтов обновляет время
+    изменения), не удаляется: на него может сослаться публикация, которая
+    ещё не сохранена. Такие файлы убирает ``collect_images``.
+    """
+    storage = Post._meta.get_field('image').storage
+    with transaction.atomic():
+        if Post.objects.select_for_update().filter(image=name).exists():
+            return False
+        if (since is not None and storage.exists(name)
+                and storage.get_modified_time(name) > since):
+            return False
+        storage.delete(name)
+        delete_renditions(storage, name)
+    return True
+
+
+def release_image_on_commit(name):
+    if name:
+        since = timezone.now()
+        transaction.on_commit(lambda: release_image(name, since))
+
+
+def enqueue_image_job(post):
+    """Ставит картинку публикации в очередь обработки.
+
+    Пока задача не выполнена, публикация помечена ``image_processing``
+    и шаблоны показывают исходный файл без уменьшенных копий. Если все
+    попытки провалились, в ``image_error`` записывается причина, и
+    исходный файл показывается и дальше.
+    """
+    Post.objects.filter(pk=post.pk).update(
+        image_processing=True, image_error=''
+    )
+    post.image_processing, post.image_error = True, ''
+    job = ImageJob.objects.create(post=post, image_name=post.image.name)
+    if settings.BLOG_IMAGE_JOBS_EAGER:
+        transaction.on_commit(lambda: run_image_job(job))
+
+
+def claim_image_job():
+    now = timezone.now()
+    candidates = ImageJob.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        attempts__lt=JOB_MAX_ATTEMPTS,
+    )
+    for job in candidates[:10]:
+        claimed = ImageJob.objects.filter(
+            pk=job.pk, locked_until=job.locked_until
+        ).update(locked_until=now + JOB_LEASE, attempts=F('attempts') + 1)
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run_image_job(job):
+    post = Post.objects.filter(pk=job.post_id).only('pk', 'image').first()
+    if post is None or post.image.name != job.image_name:
+        job.delete()
+        return
+    try:
+        name = strip_and_reencode(post.image)
+        post.image.name = name
+        storage = post.image.storage
+        if not all(map(storage.exists, rendition_names(name))):
+            build_renditions(post.image)
+    except (OSError, ValueError, Image.DecompressionBombError) as error:
+        logger.warning('Не удалось обработать %s: %s', job.image_name, error)
+        if isinstance(error, Image.DecompressionBombError):
+            # Повтор не поможет: картинка слишком велика всегда.
+            job.attempts = JOB_MAX_ATTEMPTS
+        job.last_error = str(error)
+        job.locked_until = None
+        job.save(update_fields=('attempts', 'last_error', 'locked_until'))
+        if job.attempts >= JOB_MAX_ATTEMPTS:
+            finish_image_job(job, job.image_name, error=job.last_error)
+        return
+    finish_image_job(job, name)
+    job.delete()
+    if name != job.image_name:
+        release_image_on_commit(job.image_name)
+
+
+def finish_image_job(job, name, error=''):
+    Post.objects.filter(pk=job.post_id, image=job.image_name).update(
+        image=name,
+        image_processing=False,
+        image_error=error[:256],
+        updated_at=timezone.now(),
+    )
+    cache.invalidate_post_pages([job.post_id])
+
+
+def process_image_jobs(limit=None):
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_image_job()
+        if job is None:
+            break
+        run_image_job(job)
+        processed += 1
+    return processed
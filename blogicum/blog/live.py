@@ -0,0 +1,222 @@
+"""Живые комментарии: Server-Sent Events по каждой публикации.
+
+Сигналы комментариев публикуют в брокер готовый HTML комментария,
+а ASGI-приложение ``comment_events`` пересылает события подписанным
+браузерам. Django 3.2 перебирает потоковый ответ синхронно прямо в цикле
+событий, поэтому поток событий отдаётся не представлением, а отдельным
+ASGI-приложением перед Django (см. ``blogicum.asgi``). Промежуточные
+слои Django его не обслуживают, поэтому приложение само проверяет
+``ALLOWED_HOSTS``, читает пользователя из сессии и отказывает так же,
+как страница публикации. Под WSGI адрес отвечает 204, и браузер не
+переподключается.
+
+``LocalBroker`` рассылает события внутри одного процесса. При нескольких
+процессах его заменяет внешний брокер с тем же интерфейсом, путь к
+классу задаёт ``BLOG_LIVE_BROKER``.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from http import HTTPStatus
+from importlib import import_module
+from io import BytesIO
+from itertools import count
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from .async_views import run_sync
+from .models import Post
+
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 5000
+CREATED, EDITED, DELETED = 'created', 'edited', 'deleted'
+# Подписчик не успевает читать события: браузер перезагрузит комментарии.
+RESET = 'reset'
+
+
+def comment_channel(post_id):
+    return f'comments:{post_id}'
+
+
+def comment_event(event, comment):
+    """Событие о комментарии с HTML, одинаковым для всех читателей."""
+    html = '' if event == DELETED else render_to_string(
+        'includes/comment.html', {'comment': comment}
+    )
+    return {'event': event, 'id': comment.id, 'html': html}
+
+
+class Subscription:
+    def __init__(self, broker, channel, loop, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        """Передаёт событие из любого потока в цикл событий подписчика."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # Цикл событий уже закрыт.
+            self.broker.unsubscribe(self)
+
+    def _put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            message = {'event': RESET}
+            self.broker.unsubscribe(self)
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+        self._event_ids = count(1)
+
+    def has_subscribers(self, channel):
+        return bool(self._subscriptions.get(channel))
+
+    def subscribe(self, channel):
+        subscription = Subscription(
+            self, channel, asyncio.get_running_loop(), self.queue_size
+        )
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def publish(self, channel, message):
+        message = {**message, 'event_id': next(self._event_ids)}
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.BLOG_LIVE_BROKER)()
+
+
+def format_event(message):
+    if message['event'] == RESET:
+        return b'event: reset\ndata: {}\n\n'
+    data = json.dumps({'id': message['id'], 'html': message['html']})
+    return (
+        f'id: {message["event_id"]}\nevent: {message["event"]}\n'
+        f'data: {data}\n\n'
+    ).encode()
+
+
+def _authenticate(request):
+    """Добавляет к запросу сессию и пользователя, как их промежуточные слои."""
+    engine = import_module(settings.SESSION_ENGINE)
+    request.session = engine.SessionStore(
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    request.user = get_user(request)
+
+
+def check_subscription(scope, post_id):
+    """Код ответа на подписку: 200, 400 для чужого хоста или 404.
+
+    Правило видимости то же, что у ``VisiblePostMixin``.
+    """
+    request = ASGIRequest(scope, BytesIO())
+    try:
+        request.get_host()
+    except DisallowedHost:
+        return HTTPStatus.BAD_REQUEST
+    post = (
+        Post.objects.filter(pk=post_id)
+        .only('id', 'author_id', 'visibility', 'pub_date')
+        .first()
+    )
+    if post is None:
+        return HTTPStatus.NOT_FOUND
+    if not post.is_visible:
+        # Сессия нужна, только если публикацию может видеть один автор.
+        _authenticate(request)
+        if not post.is_visible_to(request.user):
+            return HTTPStatus.NOT_FOUND
+    return HTTPStatus.OK
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def comment_events(scope, receive, send, post_id):
+    """ASGI-приложение: поток событий о комментариях публикации."""
+    status = await run_sync(check_subscription, scope, post_id)
+    if status != HTTPStatus.OK:
+        await send({
+            'type': 'http.response.start', 'status': status,
+            'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+        })
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    broker = get_broker()
+    subscription = broker.subscribe(comment_channel(post_id))
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start', 'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        chunk = f'retry: {RETRY_MILLISECONDS}\n\n'.encode()
+        while not disconnect.done():
+            await send({
+                'type': 'http.response.body', 'body': chunk,
+                'more_body': True,
+            })
+            if chunk.startswith(b'event: reset'):
+                break
+            message = asyncio.ensure_future(subscription.get())
+            await asyncio.wait(
+                {message, disconnect}, timeout=HEARTBEAT_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if message.done():
+                chunk = format_event(message.result())
+            else:
+                message.cancel()
+                chunk = b': keep-alive\n\n'
+        if not disconnect.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        broker.unsubscribe(subscription)
+        disconnect.cancel()
+
+
+def comment_events_unavailable(request, post_id):
+    """Адрес потока событий под WSGI: держать поток соединением нельзя."""
+    return HttpResponse(status=204)
@@ -0,0 +1,204 @@
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db.backends.signals import connection_created
+
+MODES = ('wsgi', 'asgi-sync', 'asgi-async')
+
+
+def wsgi_environ(url, method='GET', body=b'', headers=()):
+    parts = urlsplit(url)
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': parts.path,
+        'QUERY_STRING': parts.query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in headers:
+        key = name.upper().replace('-', '_')
+        if key != 'CONTENT_TYPE':
+            key = 'HTTP_' + key
+        environ[key] = value
+    return environ
+
+
+def asgi_scope(url):
+    parts = urlsplit(url)
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'raw_path': parts.path.encode(),
+        'query_string': parts.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+
+
+def call_wsgi(application, url):
+    status = []
+
+    def start_response(status_line, headers, exc_info=None):
+        status.append(int(status_line.split()[0]))
+
+    body = application(wsgi_environ(url), start_response)
+    try:
+        for _ in body:
+            pass
+    finally:
+        body.close()
+    return status[0]
+
+
+async def call_asgi(application, url):
+    status = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(asgi_scope(url), receive, send)
+    return status[0]
+
+
+class QueryDelay:
+    """Задерживает каждый SQL-запрос, как сетевая СУБД."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        # В начало списка: обёртки, поставленные через execute_wrapper(),
+        # снимаются с конца.
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, self)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность и p99 задержки страниц под '
+        'WSGI и ASGI: с синхронными и с асинхронными представлениями. '
+        'Запросы выполняются в этом же процессе к текущей базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*', default=['/', '/pages/about/'],
+            help='Адреса страниц; запросы идут к ним по кругу.'
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--concurrency', type=int, default=64,
+            help='Число одновременных клиентов (и потоков WSGI-сервера).'
+        )
+        parser.add_argument(
+            '--query-delay', type=float, default=0.0,
+            help='Задержка каждого SQL-запроса в миллисекундах: SQLite '
+                 'отвечает мгновенно, а сетевая база — нет.'
+        )
+        parser.add_argument(
+            '--mode', choices=MODES, action='append',
+            help='Режимы для сравнения, по умолчанию все.'
+        )
+
+    def handle(self, *args, urls, requests, concurrency, mode, query_delay,
+               **options):
+        plan = [urls[number % len(urls)] for number in range(requests)]
+        if query_delay:
+            delay = QueryDelay(query_delay / 1000)
+            connection_created.connect(delay.install, weak=False)
+        self.stdout.write(
+            f'{requests} запросов, {concurrency} клиентов: {", ".join(urls)}'
+        )
+        self.stdout.write(
+            f'{"режим":<12}{"запр./с":>10}{"p50, мс":>10}{"p99, мс":>10}'
+            f'{"ошибки":>8}'
+        )
+        for name in mode or MODES:
+            elapsed, latencies, errors = getattr(
+                self, 'run_' + name.replace('-', '_')
+            )(plan, concurrency)
+            quantiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f'{name:<12}{len(plan) / elapsed:>10.0f}'
+                f'{quantiles[49] * 1000:>10.1f}{quantiles[98] * 1000:>10.1f}'
+                f'{errors:>8}'
+            )
+
+    def run_wsgi(self, plan, concurrency):
+        application = get_wsgi_application()
+        call_wsgi(application, plan[0])
+
+        def timed(url):
+            start = time.perf_counter()
+            status = call_wsgi(application, url)
+            return time.perf_counter() - start, status
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(timed, plan))
+        return self.summary(time.perf_counter() - start, results)
+
+    def run_asgi_sync(self, plan, concurrency):
+        return asyncio.run(self.run_asgi(ASGIHandler(), plan, concurrency))
+
+    def run_asgi_async(self, plan, concurrency):
+        # Не зависит от BLOG_ASYNC_VIEWS: замер и решает, включать ли её.
+        from blogicum.asgi import AsyncViewsASGIHandler
+
+        return asyncio.run(
+            self.run_asgi(AsyncViewsASGIHandler(), plan, concurrency)
+        )
+
+    async def run_asgi(self, application, plan, concurrency):
+        await call_asgi(application, plan[0])
+        slots = asyncio.Semaphore(concurrency)
+
+        async def timed(url):
+            async with slots:
+                start = time.perf_counter()
+                status = await call_asgi(application, url)
+                return time.perf_counter() - start, status
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*map(timed, plan))
+        return self.summary(time.perf_counter() - start, results)
+
+    def summary(self, elapsed, results):
+        if not results:
+            raise CommandError('Нет ни одного запроса.')
+        latencies = [latency for latency, _ in results]
+        errors = sum(status >= 400 for _, status in results)
+        return elapsed, latencies, errors
@@ -0,0 +1,194 @@
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from pathlib import Path
+from importlib import import_module
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model,
+)
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from blog.models import Post
+from .benchmark_handlers import wsgi_environ
+
+User = get_user_model()
+
+# Настройки SQLite и Django по умолчанию: журнал с откатом, полный fsync,
+# новое соединение на каждый запрос.
+STOCK_PROFILE = {
+    'pragmas': {'journal_mode': 'delete', 'synchronous': 'full'},
+    'conn_max_age': 0,
+}
+
+
+class Session:
+    """Вошедший пользователь: куки сессии и CSRF между запросами."""
+
+    def __init__(self, application, session_key):
+        self.application = application
+        self.cookies = {settings.SESSION_COOKIE_NAME: session_key}
+
+    def request(self, url, method='GET', data=None):
+        body = urlencode(data or {}).encode()
+        headers = [('Cookie', '; '.join(
+            f'{name}={value}' for name, value in self.cookies.items()
+        ))]
+        if method == 'POST':
+            headers += [
+                ('Content-Type', 'application/x-www-form-urlencoded'),
+                ('X-CSRFToken', self.cookies.get(settings.CSRF_COOKIE_NAME)),
+            ]
+        status = []
+
+        def start_response(status_line, response_headers, exc_info=None):
+            status.append(int(status_line.split()[0]))
+            for name, value in response_headers:
+                if name.lower() == 'set-cookie':
+                    for morsel in SimpleCookie(value).values():
+                        self.cookies[morsel.key] = morsel.value
+
+        response = self.application(
+            wsgi_environ(url, method, body, headers), start_response
+        )
+        try:
+            for _ in response:
+                pass
+        finally:
+            response.close()
+        return status[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite со стандартными '
+        'настройками и с BLOG_SQLITE_PRAGMAS и CONN_MAX_AGE из настроек на '
+        'смеси чтений страниц и добавления комментариев. Каждый прогон '
+        'идёт по временной копии текущей базы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help='Число одновременных клиентов (и потоков WSGI-сервера).'
+        )
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.2,
+            help='Доля запросов, добавляющих комментарий.'
+        )
+
+    def handle(self, *args, requests, concurrency, write_ratio, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Бенчмарк рассчитан только на SQLite.')
+        post_id = Post.objects.published().order_by(
+            '-pub_date'
+        ).values_list('pk', flat=True).first()
+        if post_id is None:
+            raise CommandError('Нет ни одной опубликованной публикации.')
+        detail = reverse('blog:post_detail', args=[post_id])
+        comment = reverse('blog:add_comment', args=[post_id])
+        generator = random.Random(0)
+        plan = [
+            ('write', comment) if generator.random() < write_ratio
+            else ('read', generator.choice((detail, '/')))
+            for _ in range(requests)
+        ]
+        tuned = {
+            'pragmas': settings.BLOG_SQLITE_PRAGMAS,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        }
+
+        self.stdout.write(
+            f'{requests} запросов, {concurrency} клиентов, '
+            f'доля записей {write_ratio:.0%}'
+        )
+        self.stdout.write(
+            f'{"профиль":<10}{"запр./с":>10}{"чтение p99":>12}'
+            f'{"запись p99":>12}{"ошибки":>8}'
+        )
+        for name, profile in (('stock', STOCK_PROFILE), ('tuned', tuned)):
+            with tempfile.TemporaryDirectory() as directory:
+                elapsed, results = self.run_profile(
+                    Path(directory) / 'benchmark.sqlite3', profile, plan,
+                    concurrency, detail,
+                )
+            errors = sum(status >= 400 for _, _, status in results)
+            self.stdout.write(
+                f'{name:<10}{len(plan) / elapsed:>10.0f}'
+                f'{self.p99(results, "read"):>12.1f}'
+                f'{self.p99(results, "write"):>12.1f}{errors:>8}'
+            )
+
+    def run_profile(self, path, profile, plan, concurrency, csrf_url):
+        connection = connections[DEFAULT_DB_ALIAS]
+        source = connection.settings_dict['NAME']
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+        connection.close()
+        connection.settings_dict.update(
+            NAME=str(path), CONN_MAX_AGE=profile['conn_max_age']
+        )
+        try:
+            with override_settings(BLOG_SQLITE_PRAGMAS=profile['pragmas']):
+                return self.run_clients(plan, concurrency, csrf_url)
+        finally:
+            connection.close()
+            connection.settings_dict['NAME'] = source
+
+    def run_clients(self, plan, concurrency, csrf_url):
+        application = get_wsgi_application()
+        user = User.objects.create_user(f'benchmark-{time.time_ns()}')
+        sessions = []
+        for _ in range(concurrency):
+            session_key = self.login(user)
+            session = Session(application, session_key)
+            # Страница публикации выдаёт CSRF-куку для формы комментария.
+            session.request(csrf_url)
+            sessions.append(session)
+        connections.close_all()
+
+        def timed(number, kind, url):
+            session = sessions[number % concurrency]
+            start = time.perf_counter()
+            if kind == 'write':
+                status = session.request(
+                    url, 'POST', {'text': f'Комментарий {number}'}
+                )
+            else:
+                status = session.request(url)
+            return kind, time.perf_counter() - start, status
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(
+                timed, range(len(plan)), *zip(*plan)
+            ))
+        return time.perf_counter() - start, results
+
+    def login(self, user):
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return session.session_key
+
+    def p99(self, results, kind):
+        latencies = [latency for name, latency, _ in results if name == kind]
+        if len(latencies) < 2:
+            return 0.0
+        return statistics.quantiles(latencies, n=100)[98] * 1000
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import build_renditions, rendition_names
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии картинок публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Пропускать картинки, у которых уже есть все копии.'
+        )
+
+    def handle(self, *args, **options):
+        built = 0
+        posts = Post.objects.exclude(image='').only('pk', 'image')
+        for post in posts.iterator():
+            storage = post.image.storage
+            if options['missing'] and all(
+                storage.exists(name) for name in rendition_names(
+                    post.image.name
+                )
+            ):
+                continue
+            try:
+                build_renditions(post.image)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'{post.image.name}: {error}')
+                continue
+            built += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано картинок: {built}')
+        )
@@ -0,0 +1,90 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.images import build_renditions, release_image, rendition_names
+from blog.models import Post
+from blog.storage import is_content_addressed
+
+
+def walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for subdirectory in directories:
+        yield from walk(storage, os.path.join(directory, subdirectory))
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит картинки публикаций под имена по хешу содержимого '
+        'и удаляет файлы, на которые не ссылается ни одна публикация. '
+        'Ненужные картинки удаляются и при правке или удалении публикаций; '
+        'команда подбирает то, что осталось (например, после сбоя).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, какие файлы будут удалены.'
+        )
+        parser.add_argument(
+            '--min-age', type=float, default=3600,
+            help='Не удалять файлы, изменённые меньше стольких секунд '
+                 'назад: на них может ссылаться публикация, которая '
+                 'сохраняется прямо сейчас.'
+        )
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        if not options['dry_run']:
+            self.rehash(storage)
+
+        referenced = set()
+        for name in Post.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).distinct().iterator():
+            referenced.add(name)
+            referenced.update(rendition_names(name))
+
+        directory = field.upload_to.rstrip('/')
+        if not storage.exists(directory):
+            return
+        removed = 0
+        changed_before = timezone.now() - timedelta(
+            seconds=options['min_age']
+        )
+        for name in walk(storage, directory):
+            if name in referenced:
+                continue
+            if storage.get_modified_time(name) > changed_before:
+                continue
+            self.stdout.write(name)
+            if not options['dry_run']:
+                storage.delete(name)
+            removed += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Файлов без ссылок: {removed}')
+        )
+
+    def rehash(self, storage):
+        posts = Post.objects.exclude(image='').only('pk', 'image')
+        for post in posts.iterator():
+            old_name = post.image.name
+            if is_content_addressed(old_name):
+                continue
+            try:
+                with storage.open(old_name) as source:
+                    new_name = storage.save(old_name, source)
+            except OSError as error:
+                self.stderr.write(f'{old_name}: {error}')
+                continue
+            Post.objects.filter(image=old_name).update(image=new_name)
+            release_image(old_name)
+            post.image.name = new_name
+            if not all(map(storage.exists, rendition_names(new_name))):
+                build_renditions(post.image)
+            self.stdout.write(f'{old_name} -> {new_name}')
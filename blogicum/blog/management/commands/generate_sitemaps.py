@@ -0,0 +1,45 @@
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import SECTIONS, render_index, render_section
+
+
+class Command(BaseCommand):
+    help = (
+        'Записывает карту сайта (sitemap.xml и куски по разделам) '
+        'в каталог, откуда её отдаёт веб-сервер.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', type=Path)
+        parser.add_argument(
+            '--base-url', required=True,
+            help='Адрес сайта без завершающего слеша, например '
+                 'https://blogicum.example.'
+        )
+
+    def handle(self, *args, output_dir, base_url, **options):
+        base_url = base_url.rstrip('/')
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for name, section in SECTIONS.items():
+            for number, _ in section.chunks():
+                filename = f'sitemap-{name}-{number}.xml'
+                self.write(
+                    output_dir / filename,
+                    render_section(name, number, base_url),
+                )
+                written.append(filename)
+        self.write(output_dir / 'sitemap.xml', render_index(base_url))
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано файлов: {len(written) + 1}'
+        ))
+
+    def write(self, path, chunks):
+        # Файл подменяется целиком: робот не увидит его недописанным.
+        temporary = path.with_name(path.name + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as output:
+            output.writelines(chunks)
+        os.replace(temporary, path)
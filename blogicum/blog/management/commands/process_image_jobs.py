@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.images import process_image_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает очередь картинок публикаций: убирает EXIF, '
+        'перекодирует оригинал и создаёт уменьшенные копии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать накопившиеся задачи и завершиться.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_image_jobs()
+            if processed:
+                self.stdout.write(f'Обработано картинок: {processed}')
+            if options['once']:
+                return
+            if not processed:
+                time.sleep(options['sleep'])
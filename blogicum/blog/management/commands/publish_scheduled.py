@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.publishing import next_publication, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Отмечает отложенные публикации показанными, как только наступает '
+        'их дата, и сбрасывает кеш затронутых лент.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Показать публикации, дата которых наступила, и завершиться.'
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60.0,
+            help='Наибольшая пауза в секундах между проверками: за это '
+                 'время будут замечены публикации, отложенные в обход '
+                 'админки и форм.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(f'Показано публикаций: {published}')
+            if options['once']:
+                return
+            time.sleep(self.sleep_seconds(options['max_sleep']))
+
+    def sleep_seconds(self, max_sleep):
+        next_date = next_publication()
+        if next_date is None:
+            return max_sleep
+        seconds_left = (next_date - timezone.now()).total_seconds()
+        return min(max_sleep, max(0.0, seconds_left))
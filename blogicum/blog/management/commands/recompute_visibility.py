@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.publishing import recompute_visibility
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает видимость публикаций, записанных в обход save() '
+        '(фикстуры, bulk_create, update()).'
+    )
+
+    def handle(self, *args, **options):
+        updated = recompute_visibility()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(source, target):
+    """Копирует SQLite-базу целиком через backup API.
+
+    Копирование ждёт конца незавершённых транзакций записи в ``source``.
+    """
+    for connection in (source, target):
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                f'{connection.alias}: копировать можно только SQLite; '
+                'для других СУБД настройте репликацию средствами СУБД.'
+            )
+        connection.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в реплики из BLOG_READ_DATABASES: '
+        'замена настоящей репликации для локальной проверки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование через столько секунд — имитация '
+                 'отставания реплики.'
+        )
+
+    def handle(self, *args, interval, **options):
+        if not settings.BLOG_READ_DATABASES:
+            raise CommandError('В BLOG_READ_DATABASES нет ни одной реплики.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        while True:
+            for alias in settings.BLOG_READ_DATABASES:
+                copy_database(primary, connections[alias])
+            self.stdout.write(
+                f'Реплики обновлены: {", ".join(settings.BLOG_READ_DATABASES)}'
+            )
+            if interval is None:
+                return
+            time.sleep(interval)
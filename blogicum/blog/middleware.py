@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.deprecation import MiddlewareMixin
+
+from .routers import choose_read_database, use_read_database
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Считает SQL-запросы и суммарное время их выполнения."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+@contextmanager
+def count_queries(stats):
+    """Считает в ``stats`` запросы текущего потока ко всем базам."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield stats
+
+
+def get_query_budget(url_name):
+    return settings.QUERY_BUDGETS.get(url_name, settings.QUERY_BUDGET_DEFAULT)
+
+
+def watched_url_name(request):
+    match = request.resolver_match
+    if match is None:
+        return None
+    view = getattr(match.func, 'view_class', match.func)
+    if view.__module__ not in settings.QUERY_BUDGET_MODULES:
+        return None
+    return match.view_name
+
+
+def check_budget(request):
+    stats = request.query_stats
+    url_name = watched_url_name(request)
+    if url_name and stats.count > get_query_budget(url_name):
+        logger.warning(
+            '%s %s (%s): %d SQL-запросов за %.1f мс при бюджете %d',
+            request.method, request.get_full_path(), url_name,
+            stats.count, stats.duration * 1000,
+            get_query_budget(url_name),
+        )
+
+
+@sync_and_async_middleware
+def query_budget_middleware(get_response):
+    """Пишет в лог запросы к блогу, превысившие бюджет SQL-запросов.
+
+    Включается при ``DEBUG`` или ``QUERY_BUDGET_CHECKS``: учёт обёртывает
+    каждый SQL-запрос. Статистика остаётся в ``request.query_stats``, её
+    проверяют тесты. Под ASGI запросы к базе выполняются в других потоках,
+    поэтому их считает сам исполнитель (см. ``blog.async_views.run_in_pool``),
+    а запросы промежуточных слоёв в этом режиме не учитываются.
+    """
+    if not (settings.DEBUG or settings.QUERY_BUDGET_CHECKS):
+        raise MiddlewareNotUsed
+
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            request.query_stats = QueryStats()
+            response = await get_response(request)
+            check_budget(request)
+            return response
+    else:
+        def middleware(request):
+            request.query_stats = QueryStats()
+            with count_queries(request.query_stats):
+                response = get_response(request)
+            check_budget(request)
+            return response
+    return middleware
+
+
+class ReadReplicaMiddleware(MiddlewareMixin):
+    """Направляет чтение безопасных запросов на реплику (``blog.routers``).
+
+    Успешный небезопасный запрос ставит cookie
+    ``BLOG_REPLICA_STICKY_COOKIE``: пока она жива, этот браузер читает
+    с основной базы. Подделка cookie лишь нагружает основную базу.
+    """
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        if (
+            request.method in self.safe_methods
+            and getattr(view, 'read_from_replica', False)
+            and settings.BLOG_REPLICA_STICKY_COOKIE not in request.COOKIES
+        ):
+            use_read_database(choose_read_database())
+
+    def process_response(self, request, response):
+        use_read_database(None)
+        if request.method not in self.safe_methods and (
+            response.status_code < 400
+        ):
+            response.set_cookie(
+                settings.BLOG_REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.BLOG_REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Меняется при любом изменении того, что видно в карточке.', verbose_name='Изменено'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:46
+
+from django.db import migrations, models
+from django.utils import timezone
+
+SCHEDULED, VISIBLE = 1, 2
+
+
+def fill_visibility(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    now = timezone.now()
+    published = Post.objects.filter(is_published=True)
+    published.filter(pub_date__gt=now).update(visibility=SCHEDULED)
+    published.filter(pub_date__lte=now).update(visibility=VISIBLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_admin_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_pub_date_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='visibility',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Скрыта'), (1, 'Отложена'), (2, 'Показывается')], default=0, editable=False, help_text='Вычисляется по галочке и дате публикации.', verbose_name='Видимость'),
+        ),
+        migrations.RunPython(fill_visibility, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('visibility', 2)), fields=['pub_date'], name='post_published_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('visibility', 2)), fields=['category', 'pub_date'], name='post_category_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('visibility', 1)), fields=['pub_date'], name='post_scheduled_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_visibility'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Меняется при любом изменении того, что видно в карточке.', null=True, verbose_name='Изменено'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Q
+from django.utils import timezone
+
+HIDDEN, SCHEDULED, VISIBLE = 0, 1, 2
+
+
+def recompute_visibility(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    now = timezone.now()
+    Post.objects.filter(
+        ~Q(visibility=HIDDEN), is_published=False
+    ).update(visibility=HIDDEN)
+    published = Post.objects.filter(is_published=True)
+    published.filter(
+        ~Q(visibility=SCHEDULED), pub_date__gt=now
+    ).update(visibility=SCHEDULED)
+    published.filter(
+        ~Q(visibility=VISIBLE), pub_date__lte=now
+    ).update(visibility=VISIBLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_updated_at_null'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_visibility, migrations.RunPython.noop),
+    ]
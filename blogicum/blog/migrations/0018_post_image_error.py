@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_recompute_post_visibility'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_error',
+            field=models.CharField(blank=True, editable=False, help_text='Уменьшенных копий нет, показывается исходный файл.', max_length=256, verbose_name='Ошибка обработки картинки'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.utils import timezone
+from django.utils.text import Truncator
+
+
+def refill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch_size = 500
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .only('pk', 'text')
+            .order_by('pk')[:batch_size]
+        )
+        if not batch:
+            return
+        # Карточки кешируются по updated_at: без него они показывали бы
+        # старый анонс до истечения кеша.
+        now = timezone.now()
+        for post in batch:
+            post.excerpt = Truncator(post.text).words(10, truncate=' …')
+            post.updated_at = now
+        Post.objects.bulk_update(batch, ['excerpt', 'updated_at'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_post_image_error'),
+    ]
+
+    operations = [
+        migrations.RunPython(refill_excerpts, migrations.RunPython.noop),
+    ]
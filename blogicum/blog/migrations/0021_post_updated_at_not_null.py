@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_updated_at(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(updated_at__isnull=True).update(
+        updated_at=Coalesce('created_at', 'pub_date')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_published_index_includes_scheduled'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Меняется при любом изменении того, что видно в карточке.', verbose_name='Изменено'),
+        ),
+    ]
@@ -1,17 +1,59 @@
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import Q
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.query import ModelIterable
 from django.utils import timezone
-from django.db.models import Count
+from django.utils.text import Truncator
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
+EXCERPT_WORDS = 10
+
+# При сохранении этих полей заново вычисляется ``Post.visibility``.
+VISIBILITY_FIELDS = {'is_published', 'pub_date', 'visibility'}
+
+
+def make_excerpt(text):
+    # Тот же суффикс, что у фильтра truncatewords, который заменил анонс.
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+class Visibility(models.IntegerChoices):
+    HIDDEN = 0, 'Скрыта'
+    SCHEDULED = 1, 'Отложена'
+    VISIBLE = 2, 'Показывается'
+
+
+def get_references():
+    # Модуль справочников сам импортирует модели.
+    from .references import get_references
+
+    return get_references()
+
+
+class ReferencesIterable(ModelIterable):
+    """Публикации с категорией и местом из справочников процесса."""
+
+    def __iter__(self):
+        references = get_references()
+        for post in super().__iter__():
+            references.attach(post)
+            yield post
 
 
 class PostQuerySet(models.QuerySet):
     def published(self):
+        # ``visibility`` отсекает скрытые публикации по частичному индексу,
+        # а сравнение с текущим временем показывает отложенную публикацию,
+        # как только наступила её дата, даже если ``publish_scheduled``
+        # не запущен или опаздывает. Условие на категорию остаётся
+        # JOIN'ом: со списком id из справочников SQLite выбирает индекс
+        # категории и сортирует главную страницу заново.
         return (
             self.filter(
-                is_published=True,
+                visibility__gt=Visibility.HIDDEN,
                 pub_date__lte=timezone.now(),
             )
             .filter(
@@ -20,19 +62,130 @@ class PostQuerySet(models.QuerySet):
             )
         )
 
-    def with_comments_count(self):
-        return self.annotate(comments_count=Count('comments'))
+    def scheduled(self):
+        return self.filter(visibility=Visibility.SCHEDULED)
+
+    def due(self, now=None):
+        """Отложенные публикации, дата которых наступила."""
+        return self.scheduled().filter(pub_date__lte=now or timezone.now())
+
+    def stale_visibility(self, now=None):
+        """Публикации, чья ``visibility`` разошлась с галочкой и датой.
+
+        Это строки, записанные в обход ``save()``: фикстуры,
+        ``bulk_create``, ``update()``. Запрос читает всю таблицу, поэтому
+        выполняется разово командой ``recompute_visibility``.
+        """
+        now = now or timezone.now()
+        return self.filter(
+            Q(is_published=False) & ~Q(visibility=Visibility.HIDDEN)
+            | Q(is_published=True, pub_date__gt=now)
+            & ~Q(visibility=Visibility.SCHEDULED)
+            | Q(is_published=True, pub_date__lte=now)
+            & ~Q(visibility=Visibility.VISIBLE)
+        )
 
     def with_related(self):
         return self.select_related('author', 'category', 'location')
 
-    def get_with_related_and_comments(self):
-        return self.with_related().with_comments_count()
+    def refresh_excerpts(self, batch_size=500):
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                self.filter(pk__gt=last_pk)
+                .only('pk', 'text')
+                .order_by('pk')[:batch_size]
+            )
+            if not batch:
+                return updated
+            now = timezone.now()
+            for post in batch:
+                post.excerpt = make_excerpt(post.text)
+                post.updated_at = now
+            self.model.objects.bulk_update(batch, ['excerpt', 'updated_at'])
+            updated += len(batch)
+            last_pk = batch[-1].pk
+
+    def with_references(self):
+        clone = self._chain()
+        clone._iterable_class = ReferencesIterable
+        return clone
+
+    def for_list(self):
+        return (
+            self.select_related('author')
+            .with_references()
+            .defer('text')
+        )
+
+    def touch(self):
+        return self.update(updated_at=timezone.now())
+
+    def recount_comments(self):
+        counts = (
+            Comment.objects
+            .filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return self.update(comments_count=Coalesce(Subquery(counts), 0))
+
+
+class LoadedValuesMixin:
+    """Запоминает значения полей в том виде, в каком их прочитали из БД."""
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_values()
+        return instance
+
+    def remember_loaded_values(self):
+        # Для файловых полей запоминается имя: объект FieldFile меняется
+        # на месте при сохранении нового файла.
+        self._loaded_values = {
+            field: getattr(self.__dict__.get(field), 'name',
+                           self.__dict__.get(field))
+            for field in self.tracked_fields
+        }
 
+    def refresh_from_db(self, using=None, fields=None):
+        previous = getattr(self, '_loaded_values', None)
+        super().refresh_from_db(using=using, fields=fields)
+        self.remember_loaded_values()
+        if previous is not None and fields is not None:
+            refreshed = {
+                self._meta.get_field(field).attname for field in fields
+            }
+            for field, value in previous.items():
+                if field not in refreshed:
+                    self._loaded_values[field] = value
 
-class Post(models.Model):
+    def loaded_value(self, field):
+        return getattr(self, '_loaded_values', {}).get(field)
+
+    def changed_fields(self):
+        if not hasattr(self, '_loaded_values'):
+            return set(self.tracked_fields)
+        return {
+            field for field, value in self._loaded_values.items()
+            if self.__dict__.get(field) != value
+        }
+
+
+class Post(LoadedValuesMixin, models.Model):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.TextField(
+        editable=False,
+        blank=True,
+        verbose_name='Анонс'
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=(
@@ -66,22 +219,115 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+        help_text='Меняется при любом изменении того, что видно в карточке.'
+    )
     image = models.ImageField(
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         null=True,
         blank=True,
     )
+    visibility = models.PositiveSmallIntegerField(
+        choices=Visibility.choices,
+        default=Visibility.HIDDEN,
+        editable=False,
+        verbose_name='Видимость',
+        help_text='Вычисляется по галочке и дате публикации.'
+    )
+    image_processing = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Картинка обрабатывается'
+    )
+    image_error = models.CharField(
+        max_length=256,
+        blank=True,
+        editable=False,
+        verbose_name='Ошибка обработки картинки',
+        help_text='Уменьшенных копий нет, показывается исходный файл.'
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
     objects = PostQuerySet.as_manager()
 
+    tracked_fields = (
+        'category_id', 'author_id', 'is_published', 'pub_date',
+        'visibility', 'image'
+    )
+
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                name='post_published_pub_date_idx',
+                condition=Q(visibility__gt=Visibility.HIDDEN)
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx',
+                condition=Q(visibility__gt=Visibility.HIDDEN)
+            ),
+            models.Index(
+                fields=('pub_date',),
+                name='post_scheduled_pub_date_idx',
+                condition=Q(visibility=Visibility.SCHEDULED)
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.title
 
+    @property
+    def is_visible(self):
+        return (
+            self.visibility != Visibility.HIDDEN
+            and self.pub_date <= timezone.now()
+        )
+
+    def is_visible_to(self, user):
+        """Скрытую или отложенную публикацию видит только её автор."""
+        return self.is_visible or (
+            user.is_authenticated and user.pk == self.author_id
+        )
+
+    def current_visibility(self):
+        if not self.is_published:
+            return Visibility.HIDDEN
+        if self.pub_date is not None and self.pub_date > timezone.now():
+            return Visibility.SCHEDULED
+        return Visibility.VISIBLE
 
-class Category(models.Model):
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+            if update_fields is not None and 'text' in update_fields:
+                update_fields.add('excerpt')
+        if update_fields is None or VISIBILITY_FIELDS & update_fields:
+            self.visibility = self.current_visibility()
+            if update_fields is not None:
+                update_fields.add('visibility')
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+
+class Category(LoadedValuesMixin, models.Model):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     description = models.TextField(verbose_name='Описание')
     slug = models.SlugField(
@@ -102,6 +348,8 @@ class Category(models.Model):
         verbose_name='Добавлено'
     )
 
+    tracked_fields = ('slug',)
+
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
@@ -130,7 +378,7 @@ class Location(models.Model):
         return self.name
 
 
-class Comment(models.Model):
+class Comment(LoadedValuesMixin, models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -151,10 +399,59 @@ class Comment(models.Model):
         verbose_name='Создан'
     )
 
+    tracked_fields = ('post_id',)
+
     class Meta:
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx'
+            ),
+            models.Index(
+                fields=('created_at',), name='comment_created_at_idx'
+            ),
+        )
 
     def __str__(self):
         return f'Комментарий от {self.author} к "{self.post}"'
+
+
+class ImageJob(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация'
+    )
+    image_name = models.CharField(
+        max_length=255,
+        verbose_name='Файл картинки'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Занята обработчиком до'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+
+    class Meta:
+        ordering = ('created_at', 'id')
+        verbose_name = 'обработка картинки'
+        verbose_name_plural = 'Обработка картинок'
+
+    def __str__(self):
+        return f'{self.image_name} ({self.post_id})'
@@ -0,0 +1,196 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+FORWARD = 'next'
+BACKWARD = 'prev'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(values, direction=FORWARD):
+    payload = [direction] + [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields_count):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, *values = json.loads(raw)
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor(cursor)
+    if direction not in (FORWARD, BACKWARD) or len(values) != fields_count:
+        raise InvalidCursor(cursor)
+    return direction, values
+
+
+class CursorPage:
+    """Страница выдачи, полученная поиском по ключу (keyset)."""
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу сортировки вместо LIMIT/OFFSET.
+
+    Страница выбирается условием «строго после курсора» по полям
+    ``ordering`` и запросом ``LIMIT per_page + 1``: лишняя строка лишь
+    сообщает, есть ли следующая страница. Запрос ``COUNT(*)`` не
+    выполняется, поэтому стоимость страницы не зависит от её номера.
+    Последнее поле ``ordering`` должно быть уникальным (обычно ``id``).
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in self.ordering)
+
+    def _seek_filter(self, values, reverse):
+        condition = Q()
+        for position in reversed(range(len(self.ordering))):
+            field, value = self.fields[position], values[position]
+            descending = self.ordering[position].startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            step = Q(**{f'{field}__{lookup}': value})
+            if condition:
+                step |= Q(**{field: value}) & condition
+            condition = step
+        return condition
+
+    def _parse_values(self, values):
+        """Приводит значения курсора к типам полей ``ordering``.
+
+        Курсор приходит от клиента: значение не того типа не должно
+        дойти до запроса.
+        """
+        opts = self.queryset.model._meta
+        parsed = []
+        for field, value in zip(self.fields, values):
+            if value is None or isinstance(value, (bool, list, dict)):
+                raise InvalidCursor(value)
+            try:
+                value = opts.get_field(field).to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise InvalidCursor(value)
+            parsed.append(value)
+        return parsed
+
+    def _cursor_values(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def cursor_after(self, obj):
+        """Курсор страницы, начинающейся сразу после ``obj``."""
+        return encode_cursor(self._cursor_values(obj))
+
+    def page(self, cursor=None):
+        direction = FORWARD
+        queryset = self.queryset
+        if cursor:
+            try:
+                direction, values = decode_cursor(cursor, len(self.fields))
+                values = self._parse_values(values)
+            except InvalidCursor:
+                raise Http404('Некорректный курсор страницы.')
+            queryset = queryset.filter(
+                self._seek_filter(values, reverse=direction == BACKWARD)
+            )
+        if direction == BACKWARD:
+            ordering = [
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in self.ordering
+            ]
+        else:
+            ordering = self.ordering
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == BACKWARD:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.cursor_after(rows[-1])
+        if rows and has_previous:
+            previous_cursor = encode_cursor(
+                self._cursor_values(rows[0]), BACKWARD
+            )
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+
+def estimate_rows(queryset):
+    """Примерное число строк в таблице модели без ``COUNT(*)``.
+
+    PostgreSQL хранит оценку в ``pg_class.reltuples``; в остальных СУБД
+    берётся максимальный первичный ключ — один шаг по индексу. Удалённые
+    строки оценку завышают, поэтому последние страницы могут быть пустыми.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    max_pk = queryset.model._base_manager.using(queryset.db).aggregate(
+        max_pk=Max('pk')
+    )['max_pk']
+    return max_pk or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, которому для списка без фильтров хватает оценки числа строк.
+
+    С фильтрами или поиском выполняется обычный ``COUNT(*)``: выборка уже
+    сужена, и точное число нужно пользователю.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where or query.distinct:
+            return super().count
+        return estimate_rows(self.object_list)
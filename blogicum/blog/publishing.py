@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Post
+
+PUBLISH_BATCH_SIZE = 100
+
+
+def _save_visibility(queryset_for):
+    # Время берётся заново для каждой пачки: ``save()`` сравнивает дату
+    # с текущим временем, и строка не должна попасть в выборку снова.
+    saved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                queryset_for(timezone.now())
+                .select_for_update()
+                .defer('text')
+                .order_by('pub_date', 'id')[:PUBLISH_BATCH_SIZE]
+            )
+            for post in batch:
+                post.save(update_fields=('visibility', 'updated_at'))
+        saved += len(batch)
+        if len(batch) < PUBLISH_BATCH_SIZE:
+            return saved
+
+
+def publish_due_posts():
+    """Отмечает показанными отложенные публикации, дата которых наступила.
+
+    Публикация видна и без этого (``PostQuerySet.published`` сравнивает
+    дату), но сохранение через ``save()`` обновляет ``updated_at``, а
+    сигналы сбрасывают кеш лент и страниц так же, как при правке в
+    админке. Возвращает число изменённых публикаций.
+    """
+    return _save_visibility(Post.objects.due)
+
+
+def recompute_visibility():
+    """Пересчитывает ``visibility`` строк, записанных в обход ``save()``.
+
+    Читает всю таблицу, поэтому выполняется разово, после загрузки
+    фикстур или массовых правок. Возвращает число исправленных публикаций.
+    """
+    return _save_visibility(Post.objects.stale_visibility)
+
+
+def next_publication():
+    """Дата ближайшей отложенной публикации или ``None``."""
+    return Post.objects.scheduled().aggregate(
+        next_date=Min('pub_date')
+    )['next_date']
@@ -0,0 +1,142 @@
+"""Справочники категорий и местоположений в памяти процесса.
+
+Категорий и мест немного, а меняются они редко, поэтому каждый процесс
+держит их копию целиком: по ней находится категория по слагу, а
+публикациям списков подставляются категория и место без JOIN.
+
+Копия помечена версией из общего кеша ``BLOG_REFERENCES_CACHE_ALIAS``.
+Сохранение или удаление категории или места записывает новую версию, и
+остальные процессы перечитывают справочники при следующем обращении.
+Если этот кеш живёт в памяти процесса (``LocMemCache``), версию другим
+процессам не передать: копия тогда перечитывается не реже, чем раз в
+``BLOG_REFERENCES_LOCAL_TIMEOUT`` секунд.
+Объекты справочников общие для всех запросов процесса — менять их нельзя.
+"""
+import hashlib
+import threading
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+
+from .cache import is_process_local
+from .models import Category, Location, Post
+
+VERSION_KEY = 'blog:references-version'
+
+_lock = threading.Lock()
+_references = None
+
+
+class References:
+    def __init__(self, version, categories, locations):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.categories = {category.pk: category for category in categories}
+        self.categories_by_slug = {
+            category.slug: category for category in categories
+        }
+        self.locations = {location.pk: location for location in locations}
+        # Отпечаток содержимого одинаков во всех процессах с одинаковыми
+        # справочниками: по нему кешируются фрагменты с их названиями.
+        self.fingerprint = hashlib.md5(repr((
+            [(category.pk, category.slug, category.title,
+              category.is_published) for category in categories],
+            [(location.pk, location.name, location.is_published)
+             for location in locations],
+        )).encode()).hexdigest()
+
+    def published_category(self, slug):
+        category = self.categories_by_slug.get(slug)
+        if category is not None and category.is_published:
+            return category
+        return None
+
+    def attach(self, post):
+        """Подставляет публикации категорию и место из справочников.
+
+        Незнакомый идентификатор (справочник ещё не перечитан) оставляется
+        как есть: такой объект загрузится обычным запросом. Отпечаток
+        справочников записывается в ``references_version`` публикации.
+        """
+        post.references_version = self.fingerprint
+        for name, objects in (
+                ('category', self.categories), ('location', self.locations)
+        ):
+            field = Post._meta.get_field(name)
+            pk = getattr(post, field.attname)
+            if pk in objects:
+                field.set_cached_value(post, objects[pk])
+
+
+def _shared_cache():
+    cache = caches[settings.BLOG_REFERENCES_CACHE_ALIAS]
+    if is_process_local(cache):
+        return None
+    return cache
+
+
+def _load(version):
+    # Справочники читаются с основной базы: реплика может отставать
+    # от записи, которая сменила версию.
+    database = router.db_for_write(Category)
+    return References(
+        version,
+        list(Category.objects.using(database)),
+        list(Location.objects.using(database)),
+    )
+
+
+def _is_current(references, version):
+    if references is None:
+        return False
+    if version is None:
+        age = time.monotonic() - references.loaded_at
+        return age < settings.BLOG_REFERENCES_LOCAL_TIMEOUT
+    return references.version == version
+
+
+def get_references():
+    global _references
+    cache = _shared_cache()
+    version = cache and cache.get_or_set(VERSION_KEY, uuid4().hex, None)
+    references = _references
+    if not _is_current(references, version):
+        with _lock:
+            if not _is_current(_references, version):
+                _references = _load(version)
+            references = _references
+    return references
+
+
+def _renew():
+    global _references
+    cache = _shared_cache()
+    version = None
+    if cache is not None:
+        version = uuid4().hex
+        cache.set(VERSION_KEY, version, None)
+    with _lock:
+        _references = _load(version)
+
+
+def _forget():
+    global _references
+    with _lock:
+        _references = None
+
+
+def invalidate_references(using=None):
+    """Сменяет версию справочников и перечитывает их в этом процессе.
+
+    Внутри транзакции копия процесса только сбрасывается, а новая версия
+    записывается после коммита: при откате в справочниках не должно
+    остаться несохранённых строк.
+    """
+    if transaction.get_connection(using).in_atomic_block:
+        _forget()
+        transaction.on_commit(_renew, using=using)
+    else:
+        _renew()
@@ -0,0 +1,56 @@
+"""Чтение с реплик базы данных.
+
+``ReadReplicaMiddleware`` выбирает реплику для безопасных запросов к
+представлениям с ``read_from_replica = True``, а ``ReadReplicaRouter``
+направляет туда чтение до конца запроса. Запись всегда идёт в
+``default``. После собственной записи пользователь
+``BLOG_REPLICA_STICKY_SECONDS`` секунд читает с основной базы: реплика
+могла ещё не догнать её, а он ждёт увидеть свою публикацию.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Сессии проверяют вход пользователя и меняются при каждом входе:
+# их всегда читаем с основной базы.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_read_database = ContextVar('blog_read_database', default=None)
+
+
+def choose_read_database():
+    replicas = settings.BLOG_READ_DATABASES
+    return random.choice(replicas) if replicas else None
+
+
+def use_read_database(alias):
+    _read_database.set(alias)
+
+
+def current_read_database():
+    return _read_database.get()
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        # Без явного ответа Django запишет объект туда, откуда прочитал.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.BLOG_READ_DATABASES}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схему и данные реплики получают копированием с основной базы.
+        if db in settings.BLOG_READ_DATABASES:
+            return False
+        return None
@@ -0,0 +1,172 @@
+"""Полнотекстовый поиск по публикациям.
+
+Бэкенд выбирается настройкой ``BLOG_SEARCH_BACKEND`` (путь к классу);
+по умолчанию на SQLite используется таблица FTS5 ``blog_post_fts``,
+на остальных СУБД — поиск подстроки. Сниппеты возвращаются как текст,
+где найденные слова обрамлены символами ``MARK_START``/``MARK_END``:
+экранирование и разметку делает фильтр ``highlight``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+MARK_START = '\x02'
+MARK_END = '\x03'
+ELLIPSIS = '…'
+MAX_TERMS = 8
+SNIPPET_WORDS = 24
+SNIPPET_CHARS = 160
+
+_TERM_RE = re.compile(r'\w+')
+
+
+def parse_terms(query):
+    """Слова запроса; операторы FTS5 из ввода пользователя не проходят."""
+    return _TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+class SearchBackend:
+    def search(self, queryset, terms):
+        """Оставляет в ``queryset`` найденные публикации по релевантности."""
+        raise NotImplementedError
+
+    def snippet(self, post, terms):
+        """Фрагмент текста вокруг первого совпадения."""
+        text = post.text
+        lowered = text.lower()
+        positions = [
+            position for position in map(lowered.find, terms)
+            if position >= 0
+        ]
+        start = max(0, min(positions, default=0) - SNIPPET_CHARS // 3)
+        fragment = text[start:start + SNIPPET_CHARS]
+        fragment = re.sub(
+            '|'.join(map(re.escape, terms)),
+            lambda match: f'{MARK_START}{match[0]}{MARK_END}',
+            fragment,
+            flags=re.IGNORECASE,
+        )
+        prefix = ELLIPSIS if start else ''
+        suffix = ELLIPSIS if start + SNIPPET_CHARS < len(text) else ''
+        return f'{prefix}{fragment}{suffix}'
+
+    def index(self, posts):
+        pass
+
+    def remove(self, post_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SubstringSearchBackend(SearchBackend):
+    """Поиск ``ILIKE`` по заголовку и тексту для СУБД без FTS5."""
+
+    def search(self, queryset, terms):
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(text__icontains=term)
+        return (
+            queryset.filter(condition)
+            .defer(None)
+            .order_by('-pub_date', '-id')
+        )
+
+
+class FTS5SearchBackend(SearchBackend):
+    """Индекс в виртуальной таблице FTS5, ``rowid`` совпадает с ``Post.id``.
+
+    Таблица создаётся миграцией ``0013_post_search_index`` и обновляется
+    сигналами; ``manage.py rebuild_search_index`` перестраивает её целиком.
+    """
+
+    table = 'blog_post_fts'
+
+    def match_expression(self, terms):
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, terms):
+        expression = self.match_expression(terms)
+        matched_ids = RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [expression],
+        )
+        return (
+            queryset.filter(id__in=matched_ids)
+            .annotate(
+                search_rank=self._match_column(
+                    'rank', expression, FloatField()
+                ),
+                search_snippet=self._match_column(
+                    f"snippet({self.table}, -1, '{MARK_START}', "
+                    f"'{MARK_END}', '{ELLIPSIS}', {SNIPPET_WORDS})",
+                    expression, TextField(),
+                ),
+            )
+            .order_by('search_rank', '-id')
+        )
+
+    def _match_column(self, column, expression, output_field):
+        """Вспомогательный столбец FTS5 (``rank``, ``snippet()``) для строки.
+
+        Функции FTS5 работают только в запросе с ``MATCH``, поэтому столбец
+        берётся коррелированным подзапросом по ``rowid``.
+        """
+        return RawSQL(
+            f'SELECT {column} FROM {self.table} '
+            f'WHERE {self.table} MATCH %s '
+            f'AND {self.table}.rowid = {Post._meta.db_table}.id',
+            [expression],
+            output_field=output_field,
+        )
+
+    def snippet(self, post, terms):
+        return post.search_snippet
+
+    def index(self, posts):
+        rows = [(post.pk, post.title, post.text) for post in posts]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk, *_ in rows],
+            )
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                rows,
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk in post_ids],
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                f'SELECT id, title, text FROM {Post._meta.db_table}'
+            )
+            cursor.execute(
+                f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')"
+            )
+
+
+def get_search_backend():
+    path = settings.BLOG_SEARCH_BACKEND
+    if path is None:
+        return (
+            FTS5SearchBackend() if connection.vendor == 'sqlite'
+            else SubstringSearchBackend()
+        )
+    return import_string(path)()
@@ -0,0 +1,187 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache, live
+from .images import enqueue_image_job, release_image_on_commit
+from .models import Category, Comment, Location, Post
+from .references import invalidate_references
+from .search import get_search_backend
+
+User = get_user_model()
+
+# Поля, которые попадают в поисковый индекс.
+SEARCH_FIELDS = {'title', 'text'}
+
+# Поля, от которых зависит, на каких страницах ленты окажется публикация.
+FEED_FIELDS = {
+    'category_id', 'author_id', 'is_published', 'pub_date', 'visibility'
+}
+
+# Публикации, удаляемые прямо сейчас: каскадное удаление их комментариев
+# не должно порождать UPDATE счётчика на каждую строку.
+_deleting_posts = threading.local()
+
+
+def _posts_being_deleted():
+    if not hasattr(_deleting_posts, 'ids'):
+        _deleting_posts.ids = set()
+    return _deleting_posts.ids
+
+
+def change_comments_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta,
+        updated_at=timezone.now(),
+    )
+
+
+def feed_scopes(category_ids=(), author_ids=()):
+    category_ids = {pk for pk in category_ids if pk is not None}
+    author_ids = {pk for pk in author_ids if pk is not None}
+    scopes = [cache.INDEX_SCOPE]
+    if category_ids:
+        scopes += map(cache.category_scope, Category.objects.filter(
+            pk__in=category_ids
+        ).values_list('slug', flat=True))
+    if author_ids:
+        scopes += map(cache.profile_scope, User.objects.filter(
+            pk__in=author_ids
+        ).values_list('username', flat=True))
+    return scopes
+
+
+def publish_comment_event(event, comment, post_id=None):
+    """Сообщает читателям публикации о комментарии после коммита."""
+    post_id = post_id or comment.post_id
+    broker = live.get_broker()
+    channel = live.comment_channel(post_id)
+    if not broker.has_subscribers(channel):
+        return
+    message = live.comment_event(event, comment)
+    transaction.on_commit(lambda: broker.publish(channel, message))
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    _posts_being_deleted().add(instance.pk)
+    instance.page_scopes = feed_scopes(
+        [instance.category_id], [instance.author_id]
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    _posts_being_deleted().discard(instance.pk)
+    cache.invalidate_scopes(*instance.page_scopes)
+    cache.invalidate_post_pages([instance.pk])
+    release_image_on_commit(instance.image.name)
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        get_search_backend().index([instance])
+    changed = instance.changed_fields()
+    if 'image' in changed:
+        release_image_on_commit(instance.loaded_value('image'))
+        if instance.image:
+            enqueue_image_job(instance)
+    if changed & FEED_FIELDS:
+        cache.invalidate_scopes(*feed_scopes(
+            [instance.category_id, instance.loaded_value('category_id')],
+            [instance.author_id, instance.loaded_value('author_id')],
+        ))
+    cache.invalidate_post_pages([instance.pk])
+    instance.remember_loaded_values()
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    post_ids = {instance.post_id}
+    if created:
+        change_comments_count(instance.post_id, 1)
+        publish_comment_event(live.CREATED, instance)
+    else:
+        loaded_post_id = instance.loaded_value('post_id')
+        if loaded_post_id not in (None, instance.post_id):
+            change_comments_count(loaded_post_id, -1)
+            change_comments_count(instance.post_id, 1)
+            post_ids.add(loaded_post_id)
+            publish_comment_event(live.DELETED, instance, loaded_post_id)
+            publish_comment_event(live.CREATED, instance)
+        else:
+            Post.objects.filter(pk=instance.post_id).touch()
+            publish_comment_event(live.EDITED, instance)
+    cache.invalidate_post_pages(post_ids)
+    instance.remember_loaded_values()
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id not in _posts_being_deleted():
+        change_comments_count(instance.post_id, -1)
+        cache.invalidate_post_pages([instance.post_id])
+        publish_comment_event(live.DELETED, instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    Post.objects.filter(category=instance).touch()
+    author_ids = (
+        Post.objects.filter(category=instance)
+        .values_list('author_id', flat=True)
+        .distinct()
+    )
+    slugs = {instance.slug, instance.loaded_value('slug')} - {None}
+    cache.invalidate_scopes(
+        *feed_scopes(author_ids=author_ids),
+        *map(cache.category_scope, slugs),
+    )
+    instance.remember_loaded_values()
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def location_changed(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    posts = Post.objects.filter(location=instance)
+    posts.touch()
+    cache.invalidate_post_pages(posts.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def references_changed(sender, using, **kwargs):
+    # И при загрузке фикстур (raw): справочники должны совпадать с базой.
+    invalidate_references(using)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or kwargs.get('raw') or update_fields == {'last_login'}:
+        return
+    # Имя пользователя выводится и в его публикациях, и в его комментариях.
+    posts = Post.objects.filter(
+        Q(author=instance)
+        | Q(pk__in=Comment.objects.filter(author=instance).values('post_id'))
+    )
+    posts.touch()
+    cache.invalidate_scopes(cache.profile_scope(instance.username))
+    cache.invalidate_post_pages(posts.values_list('pk', flat=True))
@@ -0,0 +1,187 @@
+"""Карта сайта: индекс и файлы-куски по ``CHUNK_SIZE`` адресов.
+
+Кусок ``n`` раздела содержит объекты с ключом в диапазоне
+``[n * CHUNK_SIZE, (n + 1) * CHUNK_SIZE)``: выборка идёт по диапазону
+первичного ключа через ``.iterator()``, без OFFSET и без загрузки
+всего раздела в память. Размер диапазона равен пределу протокола
+(50 000 адресов), поэтому кусок никогда его не превысит.
+"""
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import F, Max
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.views import View
+
+from . import cache
+from .models import Post
+
+CHUNK_SIZE = 50_000
+ITERATOR_CHUNK_SIZE = 2_000
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class PostSection:
+    name = 'posts'
+
+    def chunks(self):
+        """Номера непустых кусков и самое позднее изменение в каждом."""
+        return (
+            Post.objects.published()
+            .annotate(chunk=F('id') / CHUNK_SIZE)
+            .values_list('chunk')
+            .annotate(lastmod=Max('updated_at'))
+            .order_by('chunk')
+        )
+
+    def urls(self, number):
+        start = number * CHUNK_SIZE
+        rows = (
+            Post.objects.published()
+            .filter(id__gte=start, id__lt=start + CHUNK_SIZE)
+            .order_by('id')
+            .values_list('id', 'updated_at')
+            .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        )
+        for post_id, updated_at in rows:
+            yield reverse('blog:post_detail', args=(post_id,)), updated_at
+
+
+class ProfileSection:
+    """Профили авторов опубликованных записей, куски — по id автора."""
+
+    name = 'profiles'
+
+    def chunks(self):
+        return (
+            Post.objects.published()
+            .annotate(chunk=F('author_id') / CHUNK_SIZE)
+            .values_list('chunk')
+            .annotate(lastmod=Max('updated_at'))
+            .order_by('chunk')
+        )
+
+    def urls(self, number):
+        start = number * CHUNK_SIZE
+        rows = (
+            Post.objects.published()
+            .filter(author_id__gte=start, author_id__lt=start + CHUNK_SIZE)
+            .values_list('author_id', 'author__username')
+            .annotate(lastmod=Max('updated_at'))
+            .order_by('author_id')
+            .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        )
+        for _, username, lastmod in rows:
+            yield reverse('blog:profile', args=(username,)), lastmod
+
+
+class CategorySection:
+    """Категории с опубликованными записями; их мало, кусок один."""
+
+    name = 'categories'
+
+    def chunks(self):
+        lastmod = self._rows().aggregate(lastmod=Max('updated_at'))['lastmod']
+        return [(0, lastmod)] if lastmod else []
+
+    def _rows(self):
+        return Post.objects.published().filter(category__isnull=False)
+
+    def urls(self, number):
+        if number != 0:
+            return
+        rows = (
+            self._rows()
+            .values_list('category__slug')
+            .annotate(lastmod=Max('updated_at'))
+            .order_by('category__slug')
+        )
+        for slug, lastmod in rows:
+            yield reverse('blog:category_posts', args=(slug,)), lastmod
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def section_path(name, number):
+    return reverse('blog:sitemap_section', args=(name, number))
+
+
+def _entry(tag, location, lastmod):
+    lastmod_xml = (
+        f'<lastmod>{lastmod.isoformat(timespec="seconds")}</lastmod>'
+        if lastmod else ''
+    )
+    return f'<{tag}><loc>{escape(location)}</loc>{lastmod_xml}</{tag}>\n'
+
+
+def index_entries():
+    """Непустые куски всех разделов: ``(раздел, номер, lastmod)``."""
+    return [
+        (name, number, lastmod)
+        for name, section in SECTIONS.items()
+        for number, lastmod in section.chunks()
+    ]
+
+
+def cached_index_entries():
+    """``index_entries()`` из кеша страниц, в области главной ленты.
+
+    Версия области меняется, когда публикация появляется, исчезает или
+    меняет категорию либо автора, — то есть вместе с набором кусков.
+    ``lastmod`` куска после правки одной публикации обновится через
+    ``BLOG_PAGE_CACHE_TIMEOUT``.
+    """
+    key = cache.page_key(cache.INDEX_SCOPE, reverse('blog:sitemap'))
+    entries = cache.page_cache().get(key)
+    if entries is None:
+        entries = index_entries()
+        cache.page_cache().set(
+            key, entries, settings.BLOG_PAGE_CACHE_TIMEOUT
+        )
+    return entries
+
+
+def render_index(base_url, entries=index_entries):
+    yield f'{XML_HEADER}<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for name, number, lastmod in entries():
+        yield _entry(
+            'sitemap', base_url + section_path(name, number), lastmod
+        )
+    yield '</sitemapindex>\n'
+
+
+def render_section(name, number, base_url):
+    yield f'{XML_HEADER}<urlset xmlns="{SITEMAP_NS}">\n'
+    for path, lastmod in SECTIONS[name].urls(number):
+        yield _entry('url', base_url + path, lastmod)
+    yield '</urlset>\n'
+
+
+class SitemapView(View):
+    http_method_names = ['get', 'head']
+
+    def base_url(self):
+        return self.request.build_absolute_uri('/').rstrip('/')
+
+    def render(self, chunks):
+        return StreamingHttpResponse(chunks, content_type='application/xml')
+
+
+class SitemapIndexView(SitemapView):
+    def get(self, request):
+        return self.render(
+            render_index(self.base_url(), cached_index_entries)
+        )
+
+
+class SitemapSectionView(SitemapView):
+    def get(self, request, section, number):
+        if section not in SECTIONS:
+            raise Http404('Нет такого раздела карты сайта.')
+        return self.render(render_section(section, number, self.base_url()))
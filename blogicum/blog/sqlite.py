@@ -0,0 +1,40 @@
+"""Настройка соединений с SQLite под одновременную нагрузку.
+
+При каждом новом соединении выполняются PRAGMA из
+``BLOG_SQLITE_PRAGMAS``. В режиме WAL читатели не ждут писателя, а
+``busy_timeout`` заставляет писателя подождать освобождения базы вместо
+немедленной ошибки ``database is locked``. С ``CONN_MAX_AGE`` соединение
+переживает запрос, и PRAGMA выполняются один раз на поток.
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+NAME_RE = re.compile(r'^[a-z_]+$')
+VALUE_RE = re.compile(r'^(-?\d+|[a-z_]+)$', re.IGNORECASE)
+
+
+def pragma_statements(pragmas):
+    """Текст PRAGMA-запросов: допускаются только числа и простые слова."""
+    statements = []
+    for name, value in pragmas.items():
+        if not NAME_RE.match(name) or not VALUE_RE.match(str(value)):
+            raise ImproperlyConfigured(
+                'BLOG_SQLITE_PRAGMAS: недопустимая настройка '
+                f'{name}={value!r}.'
+            )
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    # Напрямую через sqlite3, как Django включает foreign_keys: это
+    # настройка соединения, а не запросы страницы.
+    for statement in pragma_statements(settings.BLOG_SQLITE_PRAGMAS):
+        connection.connection.execute(statement)
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASH_LENGTH = 64
+_HASHED_RE = re.compile(rf'^[0-9a-f]{{{HASH_LENGTH}}}')
+
+
+def is_content_addressed(name):
+    """Имя вида ``<sha256>.<ext>`` или производное ``<sha256>_<...>``."""
+    return bool(_HASHED_RE.match(os.path.basename(name)))
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище, где имя файла — SHA-256 его содержимого.
+
+    Файл ``posts/photo.jpg`` сохраняется как ``posts/ab/ab12….jpg``;
+    повторная загрузка тех же байтов возвращает уже существующее имя и
+    ничего не пишет на диск. Содержимое по такому имени никогда не
+    меняется, поэтому его можно отдавать с заголовком ``immutable``.
+
+    Имя, присланное клиентом, на результат не влияет: хешируется любой
+    файл, переданный в ``save()``. Производные файлы (уменьшенные копии
+    ``<sha256>_320w.webp``) код приложения сохраняет через
+    ``save_derived()`` под именем, привязанным к оригиналу.
+    """
+
+    def hashed_name(self, name, digest):
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content_hash(content))
+        if self.exists(name):
+            # Свежая ссылка на старый файл: ни ``release_image``, ни уборка
+            # (``collect_images``) не удалят его из-под новой публикации.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+    def save_replacement(self, stored_name, content):
+        """Сохраняет новое содержимое для файла ``stored_name`` из хранилища.
+
+        Шард исходного имени отбрасывается, и новый файл ложится в тот же
+        каталог загрузки под своим хешем.
+        """
+        directory = os.path.dirname(os.path.dirname(stored_name))
+        return self.save(
+            os.path.join(directory, os.path.basename(stored_name)), content
+        )
+
+    def save_derived(self, name, content):
+        """Сохраняет производный файл под именем, которое выбрал код."""
+        return super().save(name, content)
@@ -0,0 +1,25 @@
+from django import template
+
+from blog.images import (
+    DEFAULT_RENDITION_WIDTH, RENDITION_WIDTHS, rendition_name
+)
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_rendition_url(image, width=DEFAULT_RENDITION_WIDTH, fmt='jpeg'):
+    return image.storage.url(rendition_name(image.name, width, fmt))
+
+
+@register.simple_tag
+def image_srcset(image, fmt='jpeg'):
+    return ', '.join(
+        f'{image_rendition_url(image, width, fmt)} {width}w'
+        for width in RENDITION_WIDTHS
+    )
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, css_class=''):
+    return {'post': post, 'css_class': css_class}
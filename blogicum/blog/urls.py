@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.urls import path
 
-from . import views
+from . import api, feeds, live, sitemaps, views
 
 
 app_name = 'blog'
@@ -10,6 +10,19 @@ User = get_user_model()
 
 urlpatterns = [
     path('', views.IndexView.as_view(), name='index'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path(
+        'sitemap.xml',
+        sitemaps.SitemapIndexView.as_view(),
+        name='sitemap'
+    ),
+    path(
+        'sitemap-<str:section>-<int:number>.xml',
+        sitemaps.SitemapSectionView.as_view(),
+        name='sitemap_section'
+    ),
+    path('feed/', feeds.IndexFeed.as_view(), name='index_feed'),
+    path('feed/atom/', feeds.IndexAtomFeed.as_view(), name='index_atom'),
     path(
         'posts/<int:post_id>/',
         views.PostDetailView.as_view(),
@@ -20,11 +33,31 @@ urlpatterns = [
         views.CategoryListView.as_view(),
         name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/feed/',
+        feeds.CategoryFeed.as_view(),
+        name='category_feed'
+    ),
+    path(
+        'category/<slug:category_slug>/feed/atom/',
+        feeds.CategoryAtomFeed.as_view(),
+        name='category_atom'
+    ),
     path(
         'profile/<str:username>/',
         views.ProfileView.as_view(),
         name='profile'
     ),
+    path(
+        'profile/<str:username>/feed/',
+        feeds.AuthorFeed.as_view(),
+        name='profile_feed'
+    ),
+    path(
+        'profile/<str:username>/feed/atom/',
+        feeds.AuthorAtomFeed.as_view(),
+        name='profile_atom'
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -50,6 +83,16 @@ urlpatterns = [
         views.CommentCreateView.as_view(),
         name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments'
+    ),
+    path(
+        'posts/<int:post_id>/comments/events/',
+        live.comment_events_unavailable,
+        name='comment_events'
+    ),
     path(
         'posts/<int:post_id>/edit_comment/<int:comment_id>/',
         views.CommentUpdateView.as_view(),
@@ -60,4 +103,30 @@ urlpatterns = [
         views.CommentDeleteView.as_view(),
         name='delete_comment'
     ),
+    path('api/posts/', api.PostListApiView.as_view(), name='api_posts'),
+    path(
+        'api/posts/<int:post_id>/',
+        api.PostApiView.as_view(),
+        name='api_post'
+    ),
+    path(
+        'api/posts/<int:post_id>/comments/',
+        api.CommentListApiView.as_view(),
+        name='api_post_comments'
+    ),
+    path(
+        'api/categories/',
+        api.CategoryListApiView.as_view(),
+        name='api_categories'
+    ),
+    path(
+        'api/categories/<slug:category_slug>/posts/',
+        api.CategoryPostsApiView.as_view(),
+        name='api_category_posts'
+    ),
+    path(
+        'api/profile/<str:username>/posts/',
+        api.ProfilePostsApiView.as_view(),
+        name='api_profile_posts'
+    ),
 ]
@@ -0,0 +1,9 @@
+"""URL блога для ASGI: читающие страницы отдаются асинхронно."""
+from . import urls
+from .async_views import replace_views
+
+ASYNC_VIEWS = ('index', 'category_posts', 'profile', 'post_detail')
+
+app_name = urls.app_name
+
+urlpatterns = replace_views(urls.urlpatterns, ASYNC_VIEWS)
@@ -1,111 +1,450 @@
+import hashlib
+from calendar import timegm
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
-from django.http import Http404
+from django.http import Http404, HttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect
 from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.functional import cached_property
+from django.utils.http import (
+    http_date, parse_http_date_safe, quote_etag, urlencode
+)
 from django.views.generic import (
-    DetailView, ListView, CreateView, UpdateView, DeleteView
+    DetailView, ListView, CreateView, UpdateView, DeleteView, TemplateView
 )
+from django.views.static import serve
 from django.contrib.auth.views import LoginView
 from django.urls import reverse
+from . import cache
 from .forms import PostForm, CommentForm
-from .models import Post, Category, Comment
+from .models import Post, Comment
+from .pagination import CursorPaginator
+from .references import get_references
+from .search import get_search_backend, parse_terms
+from .storage import is_content_addressed
 
 
 User = get_user_model()
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 50
+OFFSET_PAGES = 5
 
 
 class PaginationMixin:
     paginate_by = POSTS_PER_PAGE
+    cursor_pagination = False
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+    # Сколько первых страниц доступно по номеру. Дальше паджинатор ведёт
+    # по курсору, чтобы глубокие страницы не читались через OFFSET.
+    # Годится только для списков, отсортированных по ``cursor_ordering``.
+    cursor_after_page = None
+
+    def uses_cursor_pagination(self):
+        return (
+            self.cursor_pagination
+            or self.cursor_kwarg in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        # Страница нужна и валидаторам условного GET, и шаблону.
+        if not hasattr(self, '_paginated'):
+            self._paginated = self._paginate_queryset(queryset, page_size)
+        return self._paginated
+
+    def _paginate_queryset(self, queryset, page_size):
+        if not self.uses_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, ordering=self.cursor_ordering
+        )
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_page(self):
+        queryset = self.get_queryset()
+        _, page, _, _ = self.paginate_queryset(
+            queryset, self.get_paginate_by(queryset)
+        )
+        return page
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx['cursor_paginated'] = self.uses_cursor_pagination()
+        ctx['cursor_after_page'] = self.cursor_after_page
+        ctx.setdefault('pagination_query', '')
+        page = ctx.get('page_obj')
+        if (
+            self.cursor_after_page
+            and not ctx['cursor_paginated']
+            and page is not None
+            and page.has_next()
+            and page.number >= self.cursor_after_page
+        ):
+            ctx['next_cursor'] = CursorPaginator(
+                page.paginator.object_list, page.paginator.per_page,
+                ordering=self.cursor_ordering,
+            ).cursor_after(page[len(page) - 1])
+        return ctx
+
+
+class ConditionalGetMixin:
+    """Отвечает ``304 Not Modified``, не отрисовывая шаблон.
+
+    Валидаторы строятся по ``updated_at`` показанных публикаций: поле
+    меняется и при правке их комментариев, категории, места и автора.
+    В ETag входят ещё пользователь и его имя (от них зависит разметка),
+    его CSRF-кука (токен вшит в формы страницы и меняется при входе), полный
+    путь и ``get_etag_parts()``.
+    """
+
+    # Last-Modified честен, только если страница не может измениться
+    # без роста ``updated_at`` одной из её публикаций.
+    send_last_modified = True
+
+    def get_conditional_posts(self):
+        raise NotImplementedError
+
+    def get_etag_parts(self):
+        return []
+
+    def get_validators(self):
+        posts = list(self.get_conditional_posts())
+        user = self.request.user
+        csrf_cookie = None
+        if user.is_authenticated:
+            # Без куки get_token() выпустит новую, и ETag не совпадёт.
+            get_token(self.request)
+            csrf_cookie = self.request.META['CSRF_COOKIE']
+        parts = [
+            user.pk,
+            user.get_username(),
+            csrf_cookie,
+            self.request.get_full_path(),
+            [(post.id, post.updated_at.isoformat()) for post in posts],
+            *self.get_etag_parts(),
+        ]
+        etag = quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+        if not self.send_last_modified:
+            return etag, None
+        last_modified = max((post.updated_at for post in posts), default=None)
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        return etag, last_modified
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(
+                response, no_cache=True,
+                private=request.user.is_authenticated,
+            )
+            patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    # Публикация, ушедшая со страницы (скрыта или удалена), не сдвигает
+    # максимум ``updated_at`` оставшихся: списки отдают только ETag.
+    send_last_modified = False
+
+    def get_conditional_posts(self):
+        return self.get_page().object_list
+
+    def get_etag_parts(self):
+        page = self.get_page()
+        return [
+            page.has_next(),
+            page.has_previous(),
+            getattr(page.paginator, 'num_pages', None),
+        ]
+
+
+class PageCacheMixin:
+    """Кеширует готовую страницу ленты для анонимных посетителей.
+
+    Вместе со страницей сохраняются её валидаторы, так что повторный
+    запрос с ``If-None-Match`` получает 304 без запросов к базе.
+    Когда наступает дата отложенной публикации, кеш сбрасывают сигналы
+    команды ``publish_scheduled``; без неё публикация появится на
+    закешированной странице через ``BLOG_PAGE_CACHE_TIMEOUT``.
+    """
+
+    cached_headers = ('ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+    def get_page_cache_scope(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = cache.page_key(
+            self.get_page_cache_scope(),
+            cache.page_path(request, (self.page_kwarg, self.cursor_kwarg)),
+        )
+        page = cache.get_page(key)
+        if page is not None:
+            return self.cached_response(request, page)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: self.store_page(key, rendered)
+            )
+        return response
+
+    def cached_response(self, request, page):
+        response = HttpResponse(page['content'])
+        for header, value in page['headers'].items():
+            response[header] = value
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')
+            ),
+            response=response,
+        )
+
+    def store_page(self, key, response):
+        if response.status_code != 200:
+            return
+        cache.store_page(
+            key,
+            {
+                'content': response.content,
+                'headers': {
+                    header: response[header]
+                    for header in self.cached_headers
+                    if response.has_header(header)
+                },
+            },
+            [post.id for post in response.context_data['page_obj']],
+        )
 
 
-class IndexView(PaginationMixin, ListView):
+class IndexView(
+        PageCacheMixin, ConditionalListMixin, PaginationMixin, ListView
+):
+    read_from_replica = True
     model = Post
+    cursor_after_page = OFFSET_PAGES
     template_name = 'blog/index.html'
     context_object_name = 'posts'
 
+    def get_page_cache_scope(self):
+        return cache.INDEX_SCOPE
+
     def get_queryset(self):
         return (
             Post.objects
             .published()
-            .get_with_related_and_comments()
-            .order_by('-pub_date')
+            .for_list()
+            .order_by('-pub_date', '-id')
         )
 
 
-class ProfileView(PaginationMixin, ListView):
+class SearchView(PaginationMixin, ListView):
+    """Поиск по опубликованным записям, результаты — по релевантности."""
+
+    read_from_replica = True
     model = Post
+    template_name = 'blog/search.html'
+    context_object_name = 'posts'
+    query_kwarg = 'q'
+    max_query_length = 200
+
+    def uses_cursor_pagination(self):
+        return False
+
+    @cached_property
+    def query(self):
+        return self.request.GET.get(self.query_kwarg, '').strip()[
+            :self.max_query_length
+        ]
+
+    @cached_property
+    def search_terms(self):
+        return parse_terms(self.query)
+
+    @cached_property
+    def search_backend(self):
+        return get_search_backend()
+
+    def get_queryset(self):
+        if not self.search_terms:
+            return Post.objects.none()
+        return self.search_backend.search(
+            Post.objects.published().for_list(), self.search_terms
+        )
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(
+            query=self.query,
+            pagination_query=urlencode({self.query_kwarg: self.query}) + '&',
+            **kwargs
+        )
+        for post in ctx['page_obj'].object_list:
+            post.search_snippet = self.search_backend.snippet(
+                post, self.search_terms
+            )
+        return ctx
+
+
+class ProfileView(
+        PageCacheMixin, ConditionalListMixin, PaginationMixin, ListView
+):
+    read_from_replica = True
+    model = Post
+    cursor_after_page = OFFSET_PAGES
     template_name = 'blog/profile.html'
     context_object_name = 'posts'
 
-    def get_profile_user(self):
+    def get_page_cache_scope(self):
+        return cache.profile_scope(self.kwargs['username'])
+
+    @cached_property
+    def profile_user(self):
         return get_object_or_404(
             User, username=self.kwargs['username']
         )
 
     def get_queryset(self):
-        user = self.get_profile_user()
-        qs = Post.objects.filter(author=user).get_with_related_and_comments()
+        user = self.profile_user
+        qs = Post.objects.filter(author=user).for_list()
 
         if not (self.request.user.is_authenticated
                 and self.request.user == user):
             qs = qs.published()
 
-        return qs.order_by('-pub_date')
+        return qs.order_by('-pub_date', '-id')
+
+    def get_etag_parts(self):
+        user = self.profile_user
+        return super().get_etag_parts() + [
+            user.username, user.get_full_name(), user.is_staff,
+            user.date_joined.isoformat(),
+        ]
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        ctx['profile_user'] = self.get_profile_user()
+        ctx['profile_user'] = self.profile_user
         return ctx
 
 
-class CategoryListView(PaginationMixin, ListView):
+class CategoryListView(
+        PageCacheMixin, ConditionalListMixin, PaginationMixin, ListView
+):
+    read_from_replica = True
     model = Post
+    cursor_after_page = OFFSET_PAGES
     template_name = 'blog/category.html'
     context_object_name = 'posts'
 
-    def get_category(self):
-        return get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True
+    def get_page_cache_scope(self):
+        return cache.category_scope(self.kwargs['category_slug'])
+
+    @cached_property
+    def category(self):
+        category = get_references().published_category(
+            self.kwargs['category_slug']
         )
+        if category is None:
+            raise Http404('Категория не найдена.')
+        return category
 
     def get_queryset(self):
-        category = self.get_category()
         return (
             Post.objects.published()
-            .filter(category=category)
-            .get_with_related_and_comments()
-            .order_by('-pub_date')
+            .filter(category=self.category)
+            .for_list()
+            .order_by('-pub_date', '-id')
         )
 
+    def get_etag_parts(self):
+        category = self.category
+        return super().get_etag_parts() + [
+            category.title, category.description
+        ]
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        ctx['category'] = self.get_category()
+        ctx['category'] = self.category
         return ctx
 
 
-class PostDetailView(DetailView):
+class VisiblePostMixin:
+    comments_per_page = COMMENTS_PER_PAGE
+
+    def get_visible_post(self, queryset=None):
+        if queryset is None:
+            queryset = Post.objects.all()
+        obj = get_object_or_404(queryset, id=self.kwargs['post_id'])
+        if not obj.is_visible_to(self.request.user):
+            raise Http404('Публикация недоступна.')
+        return obj
+
+    def get_comments_page(self, post):
+        paginator = CursorPaginator(
+            post.comments.select_related('author'),
+            self.comments_per_page,
+            ordering=('created_at', 'id'),
+        )
+        return paginator.page(self.request.GET.get('cursor'))
+
+
+class PostDetailView(ConditionalGetMixin, VisiblePostMixin, DetailView):
+    read_from_replica = True
     model = Post
     template_name = 'blog/detail.html'
     context_object_name = 'post'
 
+    @cached_property
+    def visible_post(self):
+        return self.get_visible_post(Post.objects.with_related())
+
     def get_object(self, queryset=None):
-        obj = get_object_or_404(Post, id=self.kwargs['post_id'])
-        visible = obj.is_published and obj.pub_date <= timezone.now()
-        if not visible and not (self.request.user.is_authenticated
-                                and self.request.user == obj.author):
-            raise Http404('Публикация недоступна.')
-        return obj
+        return self.visible_post
+
+    def get_conditional_posts(self):
+        return [self.visible_post]
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         post = ctx['post']
         ctx['form'] = ctx.get('form') or CommentForm()
-        ctx['comments'] = post.comments.select_related('author').all()
+        ctx['comments_page'] = self.get_comments_page(post)
+        ctx['comments'] = ctx['comments_page'].object_list
+        return ctx
+
+
+class PostCommentsView(VisiblePostMixin, TemplateView):
+    """Следующая порция комментариев для кнопки «Показать ещё»."""
+
+    read_from_replica = True
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        post = self.get_visible_post(
+            Post.objects.only('id', 'author_id', 'visibility', 'pub_date')
+        )
+        ctx['post'] = post
+        ctx['comments_page'] = self.get_comments_page(post)
+        ctx['comments'] = ctx['comments_page'].object_list
         return ctx
 
 
@@ -157,14 +496,26 @@ class ProfileEditView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         )
 
 
-class OwnerRequiredMixin(UserPassesTestMixin):
+class ObjectOwnerMixin(UserPassesTestMixin):
+    """Пускает только автора объекта.
+
+    Объект загружается один раз за запрос: его же используют проверка
+    прав, форма и адрес перенаправления.
+    """
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_owned_object'):
+            self._owned_object = super().get_object(queryset)
+        return self._owned_object
+
     def test_func(self):
-        obj = get_object_or_404(Post, id=self.kwargs['post_id'])
         return (
             self.request.user.is_authenticated
-            and obj.author == self.request.user
+            and self.get_object().author_id == self.request.user.pk
         )
 
+
+class OwnerRequiredMixin(ObjectOwnerMixin):
     def handle_no_permission(self):
         try:
             obj = self.get_object()
@@ -218,18 +569,12 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class CommentUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class CommentUpdateView(LoginRequiredMixin, ObjectOwnerMixin, UpdateView):
     model = Comment
     form_class = CommentForm
     template_name = 'blog/comment.html'
     context_object_name = 'comment'
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs['comment_id'])
-
-    def test_func(self):
-        comment = get_object_or_404(Comment, id=self.kwargs['comment_id'])
-        return comment.author == self.request.user
+    pk_url_kwarg = 'comment_id'
 
     def get_success_url(self):
         return reverse(
@@ -238,20 +583,25 @@ class CommentUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         )
 
 
-class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class CommentDeleteView(LoginRequiredMixin, ObjectOwnerMixin, DeleteView):
     model = Comment
     template_name = 'blog/comment.html'
     context_object_name = 'comment'
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs['comment_id'])
-
-    def test_func(self):
-        comment = get_object_or_404(Comment, id=self.kwargs['comment_id'])
-        return comment.author == self.request.user
+    pk_url_kwarg = 'comment_id'
 
     def get_success_url(self):
         return reverse(
             'blog:post_detail',
             kwargs={'post_id': self.object.post_id}
         )
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def serve_media(request, path, document_root=None):
+    """Отдаёт загруженные файлы; файлы с хешем в имени кешируются навсегда."""
+    response = serve(request, path, document_root=document_root)
+    if is_content_addressed(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -9,8 +9,53 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import Resolver404, resolve
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
-application = get_asgi_application()
+ASYNC_URLCONF = 'blogicum.urls_async'
+
+
+class AsyncViewsASGIHandler(ASGIHandler):
+    """Направляет запросы в URL-схему с асинхронными представлениями."""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = ASYNC_URLCONF
+        return request, error_response
+
+
+class LiveEventsRouter:
+    """Отдаёт потоки событий (``blog.live``) в обход Django."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            try:
+                match = resolve(scope['path'], urlconf=ASYNC_URLCONF)
+            except Resolver404:
+                match = None
+            if match is not None and match.view_name == 'blog:comment_events':
+                from blog.live import comment_events
+
+                return await comment_events(
+                    scope, receive, send, **match.kwargs
+                )
+        return await self.application(scope, receive, send)
+
+
+def get_application():
+    """Собирает приложение по настройке ``BLOG_ASYNC_VIEWS``."""
+    if settings.BLOG_ASYNC_VIEWS:
+        return LiveEventsRouter(AsyncViewsASGIHandler())
+    return LiveEventsRouter(ASGIHandler())
+
+
+django.setup(set_prefix=False)
+application = get_application()
@@ -42,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.query_budget_middleware',
+    'blog.middleware.ReadReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -81,9 +83,116 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переживает запрос: PRAGMA из BLOG_SQLITE_PRAGMAS
+        # выполняются один раз на поток сервера.
+        'CONN_MAX_AGE': 60,
+    },
+    # Реплика для проверки чтения с реплик на SQLite: добавьте 'replica'
+    # в BLOG_READ_DATABASES и догоняйте её командой `sync_replicas`.
+    # 'replica': {
+    #     'ENGINE': 'django.db.backends.sqlite3',
+    #     'NAME': BASE_DIR / 'db.replica.sqlite3',
+    # },
+}
+
+# PRAGMA для каждого нового соединения с SQLite (см. blog.sqlite).
+# Пустой словарь оставляет настройки SQLite по умолчанию.
+BLOG_SQLITE_PRAGMAS = {
+    # Сколько миллисекунд ждать занятую базу до `database is locked`.
+    'busy_timeout': 5000,
+    # Читатели не блокируют писателя и наоборот.
+    'journal_mode': 'wal',
+    # В режиме WAL без потери целостности: fsync только при checkpoint.
+    'synchronous': 'normal',
+    'mmap_size': 128 * 1024 * 1024,
+    # Отрицательное значение — размер кэша страниц в КиБ.
+    'cache_size': -32 * 1024,
+}
+
+DATABASE_ROUTERS = ['blog.routers.ReadReplicaRouter']
+
+# Базы, с которых читают страницы с `read_from_replica = True`.
+BLOG_READ_DATABASES = ()
+
+# Сколько секунд после своей записи пользователь читает с основной базы.
+BLOG_REPLICA_STICKY_SECONDS = 10
+
+BLOG_REPLICA_STICKY_COOKIE = 'blog_read_primary'
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Кеш готовых страниц (см. blog.cache). Правки сбрасывают страницы через
+# него, поэтому при нескольких процессах сервера он должен быть общим для
+# них (Memcached, Redis, файловый).
+BLOG_PAGE_CACHE_ALIAS = 'default'
+
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Число процессов сервера (workers gunicorn или uvicorn). Больше одного —
+# только с общим BLOG_PAGE_CACHE_ALIAS, иначе приложение не запустится.
+BLOG_SERVER_PROCESSES = 1
+
+# Кеш с версией справочников категорий и местоположений (см.
+# blog.references). При нескольких процессах сервера он должен быть общим
+# для них (Memcached, Redis, файловый): правку категории процессы увидят
+# сразу. С кешем в памяти процесса, как 'default' здесь, другие процессы
+# перечитывают справочники раз в BLOG_REFERENCES_LOCAL_TIMEOUT секунд.
+BLOG_REFERENCES_CACHE_ALIAS = 'default'
+
+BLOG_REFERENCES_LOCAL_TIMEOUT = 60
+
+# Класс поиска по публикациям, например 'blog.search.FTS5SearchBackend';
+# None — FTS5 на SQLite и поиск подстроки на остальных СУБД.
+BLOG_SEARCH_BACKEND = None
+
+
+# Бюджет SQL-запросов на один HTTP-запрос по имени URL; превышение
+# пишется в лог `blog.middleware` и роняет тесты. Вне DEBUG учёт
+# включается флагом QUERY_BUDGET_CHECKS.
+QUERY_BUDGET_CHECKS = False
+
+QUERY_BUDGET_MODULES = (
+    'blog.views', 'blog.feeds', 'blog.api', 'blog.sitemaps', 'pages.views'
+)
+
+QUERY_BUDGET_DEFAULT = 10
+
+QUERY_BUDGETS = {
+    'blog:index': 4,
+    'blog:category_posts': 4,
+    'blog:profile': 5,
+    'blog:post_detail': 4,
+    'blog:search': 4,
+    'blog:index_feed': 2,
+    'blog:index_atom': 2,
+    'blog:category_feed': 2,
+    'blog:category_atom': 2,
+    'blog:profile_feed': 3,
+    'blog:profile_atom': 3,
+    'blog:api_posts': 1,
+    'blog:api_post': 1,
+    'blog:api_post_comments': 2,
+    'blog:api_categories': 1,
+    'blog:api_category_posts': 1,
+    'blog:api_profile_posts': 4,
+    'blog:sitemap': 3,
+    'blog:sitemap_section': 1,
+    'blog:post_comments': 4,
+    'blog:create_post': 4,
+    'blog:edit_post': 5,
+    'blog:delete_post': 3,
+    'blog:add_comment': 7,
+    'blog:edit_comment': 5,
+    'blog:delete_comment': 5,
+    'pages:about': 2,
+    'pages:rules': 2,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -137,6 +246,24 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Картинки публикаций обрабатывает `manage.py process_image_jobs`;
+# True — обрабатывать прямо в запросе (удобно без запущенного обработчика).
+BLOG_IMAGE_JOBS_EAGER = False
+
+# True — под ASGI отдавать страницы асинхронными представлениями из
+# blog.async_views. Без задержек базы они медленнее обычных: включайте,
+# только если `manage.py benchmark_handlers --query-delay ...` на вашей
+# базе показывает выигрыш режима asgi-async над asgi-sync.
+BLOG_ASYNC_VIEWS = False
+
+# Потоки, в которых под ASGI выполняются представления из
+# blog.async_views; каждый держит своё соединение с базой.
+BLOG_ASYNC_VIEW_THREADS = 8
+
+# Брокер событий живых комментариев; LocalBroker работает только внутри
+# одного процесса.
+BLOG_LIVE_BROKER = 'blog.live.LocalBroker'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 DEFAULT_FROM_EMAIL = 'vi.upol_av@mail.ru'
@@ -19,7 +19,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import CreateView
 from blog.forms import CustomCreationForm
-from blog.views import ProfileRedirectLoginView
+from blog.views import ProfileRedirectLoginView, serve_media
 
 
 urlpatterns = [
@@ -46,5 +46,6 @@ handler500 = 'pages.views.server_error'
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL,
+        view=serve_media,
         document_root=settings.MEDIA_ROOT
     )
@@ -0,0 +1,21 @@
+"""URL-схема для ASGI (см. ``blogicum.asgi``).
+
+Совпадает с ``blogicum.urls``, но блог и статические страницы
+подключены из ``urls_async`` своих приложений.
+"""
+from django.urls import include, path
+
+from . import urls
+
+handler404 = urls.handler404
+handler403 = urls.handler403
+handler500 = urls.handler500
+
+urlpatterns = [
+    path('', include('blog.urls_async')),
+    path('pages/', include('pages.urls_async')),
+    *(
+        pattern for pattern in urls.urlpatterns
+        if getattr(pattern, 'app_name', None) not in ('blog', 'pages')
+    ),
+]
@@ -0,0 +1,7 @@
+from blog.async_views import replace_views
+
+from . import urls
+
+app_name = urls.app_name
+
+urlpatterns = replace_views(urls.urlpatterns, ('about', 'rules'))
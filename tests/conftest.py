@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,19 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def enable_query_budget_checks():
+    with override_settings(QUERY_BUDGET_CHECKS=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -101,6 +115,48 @@ def mixer():
     return _mixer
 
 
+def warm_references():
+    """Читает справочники категорий и мест, как это давно сделал бы процесс.
+
+    Тест идёт внутри транзакции, которая не коммитится, поэтому
+    справочники, сброшенные фикстурами, иначе перечитал бы первый запрос.
+    """
+    from blog.references import get_references
+
+    get_references()
+
+
+@pytest.fixture
+def django_assert_num_queries(django_assert_num_queries):
+    def assert_num_queries(*args, **kwargs):
+        warm_references()
+        return django_assert_num_queries(*args, **kwargs)
+
+    return assert_num_queries
+
+
+@pytest.fixture
+def assert_query_budget():
+    """Выполняет запрос клиентом и проверяет бюджет SQL-запросов,
+    объявленный для имени URL в `settings.QUERY_BUDGETS`."""
+    from blog.middleware import get_query_budget
+
+    def request_within_budget(client, url, method='get', **kwargs):
+        warm_references()
+        response = getattr(client, method)(url, **kwargs)
+        request = response.wsgi_request
+        url_name = request.resolver_match.view_name
+        budget = get_query_budget(url_name)
+        stats = request.query_stats
+        assert stats.count <= budget, (
+            f'Страница `{url}` ({url_name}) выполнила {stats.count} '
+            f'SQL-запросов при бюджете {budget}.'
+        )
+        return response
+
+    return request_within_budget
+
+
 @pytest.fixture
 def user(mixer):
     User = get_user_model()
@@ -363,6 +419,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.pagination import EstimatedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENTS_URL = '/admin/blog/comment/'
+POSTS_URL = '/admin/blog/post/'
+
+
+def _get(client, url, **params):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK
+    return response, [query['sql'] for query in ctx.captured_queries]
+
+
+@pytest.fixture
+def blend_comments(mixer, post_with_published_location, user):
+    def blend(count):
+        return mixer.cycle(count).blend(
+            'blog.Comment', post=post_with_published_location, author=user
+        )
+
+    return blend
+
+
+@pytest.mark.parametrize('url', (COMMENTS_URL, POSTS_URL))
+def test_changelist_query_count_does_not_grow(
+        admin_client, blend_comments, mixer, user, published_category, url
+):
+    blend_comments(2)
+    mixer.cycle(2).blend('blog.Post', author=user, category=published_category)
+    _, few = _get(admin_client, url)
+    blend_comments(15)
+    mixer.cycle(15).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    _, many = _get(admin_client, url)
+    assert len(many) == len(few), (
+        'Убедитесь, что число запросов страницы списка в админке не '
+        'зависит от числа строк.\n' + '\n'.join(many)
+    )
+
+
+def test_unfiltered_changelist_skips_count(admin_client, blend_comments):
+    blend_comments(3)
+    _, queries = _get(admin_client, COMMENTS_URL)
+    assert not any('COUNT(' in sql for sql in queries), (
+        'Убедитесь, что список без фильтров не выполняет COUNT(*).'
+    )
+
+
+def test_filters_are_autocomplete(admin_client, blend_comments, another_user):
+    blend_comments(2)
+    response, _ = _get(admin_client, COMMENTS_URL)
+    content = response.content.decode()
+    assert 'id="filter_author__id__exact"' in content
+    assert 'admin-autocomplete' in content
+    assert f'author__id__exact={another_user.id}' not in content, (
+        'Убедитесь, что фильтр по автору не выводит всех пользователей.'
+    )
+
+
+def test_autocomplete_filter_narrows_list(
+        admin_client, blend_comments, mixer, another_user,
+        post_with_published_location
+):
+    blend_comments(2)
+    own = mixer.blend(
+        'blog.Comment', post=post_with_published_location,
+        author=another_user,
+    )
+    response, _ = _get(
+        admin_client, COMMENTS_URL, author__id__exact=another_user.id
+    )
+    assert list(response.context['cl'].result_list) == [own]
+    assert (
+        f'<option value="{another_user.id}" selected>'
+        in response.content.decode()
+    )
+
+
+def test_estimated_count_paginator(blend_comments):
+    comments = blend_comments(5)
+    queryset = type(comments[0]).objects.all()
+    with CaptureQueriesContext(connection) as ctx:
+        assert EstimatedCountPaginator(queryset, 2).count == 5
+    assert 'COUNT(' not in ctx.captured_queries[0]['sql']
+    paginator = EstimatedCountPaginator(queryset.filter(pk__lte=2), 2)
+    assert paginator.count == 2
@@ -0,0 +1,159 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.http import StreamingHttpResponse
+
+from blog.pagination import encode_cursor
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _json(response):
+    if isinstance(response, StreamingHttpResponse):
+        content = b''.join(response.streaming_content)
+    else:
+        content = response.content
+    if response.get('Content-Encoding') == 'gzip':
+        content = gzip.decompress(content)
+    return json.loads(content)
+
+
+def _expected_ids(posts):
+    return [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True
+        )
+    ]
+
+
+@pytest.fixture
+def api_urls(user, published_category, post_with_published_location):
+    return {
+        'posts': ('/api/posts/', 1),
+        'post': (f'/api/posts/{post_with_published_location.id}/', 1),
+        'comments': (
+            f'/api/posts/{post_with_published_location.id}/comments/', 2
+        ),
+        'categories': ('/api/categories/', 1),
+        'category': (f'/api/categories/{published_category.slug}/posts/', 1),
+        'profile': (f'/api/profile/{user.username}/posts/', 2),
+    }
+
+
+@pytest.mark.parametrize(
+    'name', ('posts', 'post', 'comments', 'categories', 'category', 'profile')
+)
+def test_endpoints_have_fixed_query_count(
+        client, mixer, api_urls, post_with_published_location,
+        many_posts_with_published_locations, django_assert_num_queries, name
+):
+    mixer.cycle(5).blend('blog.Comment', post=post_with_published_location)
+    url, queries = api_urls[name]
+    with django_assert_num_queries(queries):
+        response = client.get(url, {'limit': 100})
+        data = _json(response)
+    assert response.status_code == HTTPStatus.OK
+    assert data
+
+
+def test_posts_are_published_and_cursor_paginated(
+        client, many_posts_with_published_locations, mixer, user,
+        published_category
+):
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False,
+    )
+    expected = _expected_ids(many_posts_with_published_locations)
+    first = _json(client.get('/api/posts/', {'limit': 15}))
+    assert [post['id'] for post in first['results']] == expected[:15]
+    assert first['previous'] is None
+    second = _json(client.get(first['next']))
+    assert [post['id'] for post in second['results']] == expected[15:]
+    assert second['next'] is None
+    returned = [post['id'] for post in first['results'] + second['results']]
+    assert hidden.id not in returned
+
+
+def test_sparse_fieldsets(
+        client, post_with_published_location, django_assert_num_queries
+):
+    with django_assert_num_queries(1) as ctx:
+        data = _json(client.get('/api/posts/', {'fields': 'id,title'}))
+    assert data['results'] == [{
+        'id': post_with_published_location.id,
+        'title': post_with_published_location.title,
+    }]
+    assert '"text"' not in ctx.captured_queries[0]['sql'], (
+        'Убедитесь, что без поля `text` оно не читается из базы.'
+    )
+    data = _json(client.get('/api/posts/', {'fields': 'text'}))
+    assert data['results'] == [{'text': post_with_published_location.text}]
+
+
+def test_unknown_field_is_400(client):
+    response = client.get('/api/posts/', {'fields': 'id,password'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert 'password' in _json(response)['detail']
+
+
+@pytest.mark.parametrize('url', (
+    '/api/categories/', '/api/posts/{post_id}/comments/',
+))
+def test_unknown_field_on_streamed_list_is_400(
+        client, post_with_published_location, url
+):
+    response = client.get(
+        url.format(post_id=post_with_published_location.id),
+        {'fields': 'bogus'},
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert 'bogus' in _json(response)['detail']
+
+
+@pytest.mark.parametrize('cursor', [
+    'broken', encode_cursor(['не дата', 'не число']),
+])
+def test_invalid_cursor_is_json_404(client, cursor):
+    response = client.get('/api/posts/', {'cursor': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response['Content-Type'] == 'application/json'
+
+
+def test_response_is_streamed_and_gzipped(
+        client, many_posts_with_published_locations
+):
+    response = client.get('/api/posts/', HTTP_ACCEPT_ENCODING='gzip')
+    assert response.streaming
+    assert response['Content-Encoding'] == 'gzip'
+    assert len(_json(response)['results']) == 20
+
+
+def test_hidden_post_is_visible_only_to_author(
+        client, user_client, mixer, user, published_category
+):
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False,
+    )
+    url = f'/api/posts/{hidden.id}/'
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert _json(user_client.get(url))['id'] == hidden.id
+    profile = _json(user_client.get(f'/api/profile/{user.username}/posts/'))
+    assert hidden.id in [post['id'] for post in profile['results']]
+
+
+def test_comments_in_order(client, mixer, post_with_published_location):
+    comments = mixer.cycle(3).blend(
+        'blog.Comment', post=post_with_published_location
+    )
+    data = _json(client.get(
+        f'/api/posts/{post_with_published_location.id}/comments/'
+    ))
+    assert [comment['id'] for comment in data['results']] == [
+        comment.id for comment in sorted(
+            comments, key=lambda comment: (comment.created_at, comment.id)
+        )
+    ]
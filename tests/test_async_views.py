@@ -0,0 +1,90 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, override_settings
+from django.urls import resolve, reverse
+
+from blog.urls_async import ASYNC_VIEWS
+from blogicum.asgi import (
+    ASYNC_URLCONF, AsyncViewsASGIHandler, get_application
+)
+
+# Представления выполняются в потоках пула со своими соединениями:
+# данные теста должны быть зафиксированы в базе.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def async_get():
+    client = AsyncClient()
+
+    def get(url):
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            return async_to_sync(client.get)(url)
+
+    return get
+
+
+@pytest.mark.parametrize('name', [
+    *(f'blog:{name}' for name in ASYNC_VIEWS), 'pages:about', 'pages:rules',
+])
+def test_read_views_are_coroutines(name):
+    kwargs = {
+        'blog:category_posts': {'category_slug': 'slug'},
+        'blog:profile': {'username': 'user'},
+        'blog:post_detail': {'post_id': 1},
+    }.get(name, {})
+    match = resolve(
+        reverse(name, kwargs=kwargs, urlconf=ASYNC_URLCONF),
+        urlconf=ASYNC_URLCONF,
+    )
+    assert asyncio.iscoroutinefunction(match.func)
+    assert match.func.view_class
+
+
+@pytest.mark.parametrize('enabled', [False, True])
+def test_async_views_follow_setting(settings, enabled):
+    settings.BLOG_ASYNC_VIEWS = enabled
+    handler = get_application().application
+    assert isinstance(handler, AsyncViewsASGIHandler) is enabled, (
+        'Убедитесь, что асинхронные представления включаются только '
+        'настройкой BLOG_ASYNC_VIEWS.'
+    )
+
+
+def test_async_views_are_off_by_default():
+    from blogicum.asgi import application
+
+    assert not isinstance(application.application, AsyncViewsASGIHandler)
+
+
+def test_write_views_stay_sync():
+    match = resolve('/posts/create/', urlconf=ASYNC_URLCONF)
+    assert not asyncio.iscoroutinefunction(match.func)
+
+
+def test_async_pages_render(async_get, post_with_published_location):
+    post = post_with_published_location
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+    ):
+        response = async_get(url)
+        assert response.status_code == HTTPStatus.OK, url
+        assert post.title in response.content.decode(), url
+    assert async_get('/pages/about/').status_code == HTTPStatus.OK
+
+
+def test_async_detail_hides_unpublished_post(async_get, mixer, user):
+    hidden = mixer.blend('blog.Post', author=user, is_published=False)
+    response = async_get(f'/posts/{hidden.id}/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_async_views_count_queries(async_get, post_with_published_location):
+    response = async_get(f'/posts/{post_with_published_location.id}/')
+    assert response.asgi_request.query_stats.count > 0
@@ -0,0 +1,80 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _refresh(post):
+    post.refresh_from_db(fields=['comments_count'])
+    return post.comments_count
+
+
+def test_comments_count_follows_views(
+        user_client, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Второй'})
+    assert _refresh(post) == 2, (
+        'Убедитесь, что при создании комментария увеличивается '
+        'счётчик комментариев публикации.'
+    )
+    comment = CommentModel.objects.filter(post=post).first()
+    user_client.post(
+        f'/posts/{post.id}/delete_comment/{comment.id}/', data={}
+    )
+    assert _refresh(post) == 1, (
+        'Убедитесь, что при удалении комментария уменьшается '
+        'счётчик комментариев публикации.'
+    )
+
+
+def test_comments_count_follows_moves_and_cascades(
+        mixer, post_with_published_location, post_of_another_author,
+        CommentModel
+):
+    first, second = post_with_published_location, post_of_another_author
+    comments = mixer.cycle(3).blend(CommentModel, post=first)
+    assert _refresh(first) == 3
+
+    moved = CommentModel.objects.get(pk=comments[0].pk)
+    moved.post = second
+    moved.save()
+    assert (_refresh(first), _refresh(second)) == (2, 1)
+
+    comments[1].author.delete()
+    assert _refresh(first) == 1
+
+
+def test_post_delete_skips_counter_updates(
+        mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    mixer.cycle(5).blend(CommentModel, post=post)
+    with CaptureQueriesContext(connection) as ctx:
+        post.delete()
+    assert not any(
+        q['sql'].startswith('UPDATE') for q in ctx.captured_queries
+    )
+
+
+def test_recount_comments_command(
+        mixer, post_with_published_location, CommentModel, PostModel
+):
+    post = post_with_published_location
+    mixer.cycle(4).blend(CommentModel, post=post)
+    PostModel.objects.update(comments_count=0)
+    call_command('recount_comments', stdout=StringIO())
+    assert _refresh(post) == 4
+
+
+def test_list_queries_do_not_group_by(
+        client, many_posts_with_published_locations
+):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get('/')
+    assert not any('GROUP BY' in q['sql'] for q in ctx.captured_queries)
@@ -0,0 +1,165 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url, response, **headers):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+
+
+def test_detail_returns_304_without_rendering(
+        client, post_with_published_location, django_assert_num_queries
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    response = client.get(url)
+    assert response.has_header('ETag') and response.has_header(
+        'Last-Modified'
+    )
+    with django_assert_num_queries(1):
+        repeat = _revalidate(client, url, response)
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что страница публикации отвечает 304, если у клиента '
+        'актуальная версия.'
+    )
+    assert not repeat.templates
+
+
+def test_detail_if_modified_since(client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.id}/'
+    response = client.get(url)
+    repeat = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_new_comment_changes_detail_etag(
+        client, mixer, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    response = client.get(url)
+    mixer.blend('blog.Comment', post=post_with_published_location)
+    repeat = _revalidate(client, url, response)
+    assert repeat.status_code == HTTPStatus.OK
+    assert repeat['ETag'] != response['ETag']
+
+
+def test_etag_depends_on_user(
+        client, user_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    anonymous = client.get(url)
+    repeat = _revalidate(user_client, url, anonymous)
+    assert repeat.status_code == HTTPStatus.OK
+    assert 'private' in repeat['Cache-Control']
+    assert 'Cookie' in repeat['Vary']
+
+
+def test_cached_feed_revalidates_without_queries(
+        client, many_posts_with_published_locations,
+        django_assert_num_queries
+):
+    response = client.get('/')
+    with django_assert_num_queries(0):
+        repeat = _revalidate(client, '/', response)
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize('url', ('/', '/?page=2', '/?cursor='))
+def test_feed_returns_304_for_authenticated(
+        user_client, many_posts_with_published_locations, url
+):
+    response = user_client.get(url)
+    repeat = _revalidate(user_client, url, response)
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED
+    assert not repeat.templates
+
+
+def test_new_post_changes_feed_etag(
+        user_client, mixer, user, published_category,
+        many_posts_with_published_locations
+):
+    response = user_client.get('/')
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(),
+    )
+    assert _revalidate(user_client, '/', response).status_code == (
+        HTTPStatus.OK
+    )
+
+
+def test_profile_edit_changes_etag(client, another_user):
+    url = f'/profile/{another_user.username}/'
+    response = client.get(url)
+    another_user.first_name = 'Новое имя'
+    another_user.save()
+    assert _revalidate(client, url, response).status_code == HTTPStatus.OK
+
+
+def test_commenter_rename_changes_detail_etag(
+        client, mixer, another_user, post_with_published_location
+):
+    mixer.blend(
+        'blog.Comment', post=post_with_published_location,
+        author=another_user,
+    )
+    url = f'/posts/{post_with_published_location.id}/'
+    response = client.get(url)
+    another_user.username = 'renamed'
+    another_user.save()
+    repeat = _revalidate(client, url, response)
+    assert repeat.status_code == HTTPStatus.OK, (
+        'Убедитесь, что правка профиля комментатора меняет ETag страницы '
+        'публикации.'
+    )
+    assert '@renamed' in repeat.content.decode()
+
+
+def test_viewer_rename_changes_etag(
+        user_client, user, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    response = user_client.get(url)
+    type(user).objects.filter(pk=user.pk).update(username='renamed')
+    assert _revalidate(user_client, url, response).status_code == (
+        HTTPStatus.OK
+    )
+
+
+def test_relogin_changes_detail_etag(
+        client, user, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    client.force_login(user)
+    response = client.get(url)
+    client.logout()
+    client.force_login(user)
+    repeat = _revalidate(client, url, response)
+    assert repeat.status_code == HTTPStatus.OK, (
+        'Убедитесь, что после нового входа страница с формой комментария '
+        'отрисовывается заново: в ней новый CSRF-токен.'
+    )
+    token = client.cookies['csrftoken'].value
+    assert client.post(
+        f'/posts/{post_with_published_location.id}/comment/',
+        {'text': 'Комментарий', 'csrfmiddlewaretoken': token},
+    ).status_code == HTTPStatus.FOUND
+
+
+def test_hidden_post_changes_feed_validators(
+        user_client, many_posts_with_published_locations
+):
+    response = user_client.get('/')
+    assert not response.has_header('Last-Modified')
+    post = max(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+    )
+    post.is_published = False
+    post.save()
+    repeat = _revalidate(user_client, '/', response)
+    assert repeat.status_code == HTTPStatus.OK
@@ -0,0 +1,34 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.utils.dateparse import parse_datetime
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+DB_FIXTURE = settings.BASE_DIR / 'db.json'
+
+
+def test_db_fixture_loads(client):
+    call_command('loaddata', DB_FIXTURE, verbosity=0)
+    fixture = json.loads(DB_FIXTURE.read_text(encoding='utf-8'))
+    posts = [row for row in fixture if row['model'] == 'blog.post']
+    assert Post.objects.count() == len(posts)
+    assert Post.objects.published().exists()
+    assert client.get('/').status_code == HTTPStatus.OK
+
+
+def test_loaded_posts_keep_fixture_updated_at():
+    call_command('loaddata', DB_FIXTURE, verbosity=0)
+    fixture = json.loads(DB_FIXTURE.read_text(encoding='utf-8'))
+    expected = {
+        row['pk']: parse_datetime(row['fields']['updated_at'])
+        for row in fixture if row['model'] == 'blog.post'
+    }
+    assert dict(Post.objects.values_list('pk', 'updated_at')) == expected, (
+        'Убедитесь, что у публикаций фикстуры заполнено поле updated_at.'
+    )
@@ -0,0 +1,59 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import make_excerpt
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(50))
+
+
+def test_excerpt_is_saved_from_form(
+        user_client, published_category, published_location, PostModel
+):
+    user_client.post('/posts/create/', data={
+        'title': 'Заголовок',
+        'text': LONG_TEXT,
+        'pub_date': '2020-01-01T10:00',
+        'category': published_category.id,
+        'location': published_location.id,
+    })
+    post = PostModel.objects.get(title='Заголовок')
+    assert post.excerpt == ' '.join(LONG_TEXT.split()[:10]) + ' …', (
+        'Убедитесь, что при сохранении публикации сохраняется её анонс.'
+    )
+
+
+@pytest.mark.parametrize('text', [
+    LONG_TEXT, 'Короткий текст.', 'Строка\nс переносами ' * 5,
+])
+def test_excerpt_matches_truncatewords(text):
+    assert make_excerpt(text) == truncatewords(text, 10), (
+        'Убедитесь, что анонс совпадает с выводом фильтра truncatewords.'
+    )
+
+
+def test_list_pages_do_not_load_text(
+        client, many_posts_with_published_locations
+):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/')
+    post = response.context['page_obj'].object_list[0]
+    assert post.excerpt in response.content.decode()
+    assert not any(
+        '"blog_post"."text"' in q['sql'] for q in ctx.captured_queries
+    ), 'Убедитесь, что лента не загружает полный текст публикаций.'
+
+
+def test_backfill_excerpts_command(
+        post_with_published_location, PostModel
+):
+    PostModel.objects.update(excerpt='')
+    call_command('backfill_excerpts', stdout=StringIO())
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.excerpt
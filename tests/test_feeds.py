@@ -0,0 +1,111 @@
+from datetime import timedelta
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+def _rss_links(response):
+    root = ElementTree.fromstring(response.content)
+    return [item.findtext('link') for item in root.iter('item')]
+
+
+@pytest.fixture
+def feed_urls(post_with_published_location):
+    post = post_with_published_location
+    return {
+        'index': '/feed/',
+        'category': f'/category/{post.category.slug}/feed/',
+        'profile': f'/profile/{post.author.username}/feed/',
+    }
+
+
+@pytest.mark.parametrize('name', ('index', 'category', 'profile'))
+def test_feeds_list_published_posts(
+        client, feed_urls, post_with_published_location, mixer, name
+):
+    post = post_with_published_location
+    hidden = mixer.blend(
+        'blog.Post', author=post.author, category=post.category,
+        is_published=False,
+    )
+    response = client.get(feed_urls[name])
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('application/rss+xml')
+    links = _rss_links(response)
+    assert any(link.endswith(f'/posts/{post.id}/') for link in links)
+    assert not any(link.endswith(f'/posts/{hidden.id}/') for link in links)
+
+
+def test_atom_feed(client, post_with_published_location):
+    response = client.get('/feed/atom/')
+    assert response['Content-Type'].startswith('application/atom+xml')
+    root = ElementTree.fromstring(response.content)
+    titles = [entry.findtext(f'{ATOM}title') for entry in root.iter(
+        f'{ATOM}entry'
+    )]
+    assert titles == [post_with_published_location.title]
+
+
+def test_unknown_category_feed_is_404(client):
+    assert client.get('/category/missing/feed/').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@pytest.mark.parametrize('name', ('index', 'category', 'profile'))
+def test_feeds_are_cached_and_revalidated(
+        client, feed_urls, django_assert_num_queries, name
+):
+    url = feed_urls[name]
+    response = client.get(url)
+    with django_assert_num_queries(0):
+        cached = client.get(url)
+    assert cached.content == response.content
+    with django_assert_num_queries(0):
+        client.get(url, {'x': 1})
+    with django_assert_num_queries(0):
+        repeat = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED
+    repeat = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert repeat.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize('name', ('index', 'category', 'profile'))
+def test_post_edit_invalidates_feeds(
+        client, feed_urls, post_with_published_location, name
+):
+    url = feed_urls[name]
+    response = client.get(url)
+    post_with_published_location.title = 'Новый заголовок'
+    post_with_published_location.save()
+    updated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert updated.status_code == HTTPStatus.OK
+    assert 'Новый заголовок' in updated.content.decode()
+
+
+def test_scheduled_post_enters_feed_when_published(
+        client, mixer, monkeypatch, post_with_published_location
+):
+    post = post_with_published_location
+    scheduled = mixer.blend(
+        'blog.Post', author=post.author, category=post.category,
+        is_published=True, pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    link = f'/posts/{scheduled.id}/'
+    assert not any(link in item for item in _rss_links(client.get('/feed/')))
+
+    monkeypatch.setattr(
+        timezone, 'now', lambda: scheduled.pub_date + timedelta(seconds=1)
+    )
+    assert not any(link in item for item in _rss_links(client.get('/feed/')))
+    call_command('publish_scheduled', '--once')
+    assert any(link in item for item in _rss_links(client.get('/feed/')))
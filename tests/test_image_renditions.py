@@ -0,0 +1,182 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import (
+    JOB_MAX_ATTEMPTS, process_image_jobs, rendition_name, rendition_names
+)
+from blog.models import ImageJob
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _image_file(size, name='big.jpg', exif=None):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=(10, 120, 200)).save(
+        buffer, 'JPEG', **({'exif': exif} if exif else {})
+    )
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture
+def queued_post(mixer, user, published_category):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90° по часовой.
+    exif[0x010F] = 'Camera'
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file((2000, 1000), exif=exif.tobytes()),
+    )
+
+
+@pytest.fixture
+def post_with_big_image(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=_image_file((2000, 1000)),
+    )
+    process_image_jobs()
+    post.refresh_from_db()
+    return post
+
+
+def test_image_is_queued_on_save(queued_post):
+    queued_post.refresh_from_db()
+    assert queued_post.image_processing, (
+        'Убедитесь, что новая картинка помечается как обрабатываемая.'
+    )
+    assert ImageJob.objects.filter(
+        post=queued_post, image_name=queued_post.image.name
+    ).exists()
+    assert not any(
+        default_storage.exists(name)
+        for name in rendition_names(queued_post.image.name)
+    )
+
+
+def test_processing_image_is_shown_as_is(client, queued_post):
+    content = client.get(f'/posts/{queued_post.id}/').content.decode()
+    assert f'src="{queued_post.image.url}"' in content
+    assert 'srcset' not in content
+
+
+def test_worker_strips_exif_and_builds_renditions(queued_post):
+    out = StringIO()
+    call_command('process_image_jobs', '--once', stdout=out)
+    assert 'Обработано картинок: 1' in out.getvalue()
+    queued_post.refresh_from_db()
+    assert not queued_post.image_processing
+    assert not ImageJob.objects.exists()
+    with default_storage.open(queued_post.image.name) as f:
+        image = Image.open(f)
+        assert not image.getexif(), (
+            'Убедитесь, что обработчик удаляет из картинки метаданные EXIF.'
+        )
+        assert image.size == (1000, 2000)
+    assert all(
+        default_storage.exists(name)
+        for name in rendition_names(queued_post.image.name)
+    )
+
+
+def test_stale_job_is_skipped(queued_post):
+    ImageJob.objects.update(image_name='posts/replaced.jpg')
+    assert process_image_jobs() == 1
+    assert not ImageJob.objects.exists()
+    assert not any(
+        default_storage.exists(name)
+        for name in rendition_names(queued_post.image.name)
+    )
+
+
+def test_failed_job_gives_up_after_max_attempts(client, queued_post):
+    default_storage.delete(queued_post.image.name)
+    for _ in range(JOB_MAX_ATTEMPTS):
+        ImageJob.objects.update(locked_until=None)
+        process_image_jobs()
+    job = ImageJob.objects.get()
+    assert job.attempts == JOB_MAX_ATTEMPTS and job.last_error
+    queued_post.refresh_from_db()
+    assert not queued_post.image_processing
+    assert queued_post.image_error, (
+        'Убедитесь, что после последней неудачной попытки публикация '
+        'помечается как необработанная.'
+    )
+    assert process_image_jobs() == 0
+    content = client.get(f'/posts/{queued_post.id}/').content.decode()
+    assert f'src="{queued_post.image.url}"' in content
+    assert 'srcset' not in content, (
+        'Убедитесь, что без уменьшенных копий показывается исходный файл.'
+    )
+
+
+def test_decompression_bomb_fails_at_once(monkeypatch, queued_post):
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+    assert process_image_jobs() == 1
+    job = ImageJob.objects.get()
+    assert job.attempts == JOB_MAX_ATTEMPTS and job.last_error
+    queued_post.refresh_from_db()
+    assert queued_post.image_error and not queued_post.image_processing
+    assert process_image_jobs() == 0
+
+
+def test_eager_mode_processes_after_commit(
+        settings, django_capture_on_commit_callbacks, queued_post
+):
+    settings.BLOG_IMAGE_JOBS_EAGER = True
+    queued_post.image = _image_file((640, 480), name='eager.jpg')
+    with django_capture_on_commit_callbacks(execute=True):
+        queued_post.save()
+    queued_post.refresh_from_db()
+    assert not queued_post.image_processing
+    assert default_storage.exists(
+        rendition_name(queued_post.image.name, 320, 'webp')
+    )
+
+
+def test_renditions_are_built_by_worker(post_with_big_image):
+    name = post_with_big_image.image.name
+    assert all(default_storage.exists(n) for n in rendition_names(name)), (
+        'Убедитесь, что при сохранении публикации создаются уменьшенные '
+        'копии картинки.'
+    )
+    with default_storage.open(rendition_name(name, 320, 'webp')) as f:
+        assert Image.open(f).size == (320, 160)
+    with default_storage.open(rendition_name(name, 1280, 'jpeg')) as f:
+        rendition = Image.open(f)
+        assert (rendition.format, rendition.size) == ('JPEG', (1280, 640))
+
+
+def test_small_images_are_not_upscaled(post_with_published_location):
+    process_image_jobs()
+    post_with_published_location.refresh_from_db()
+    name = post_with_published_location.image.name
+    with default_storage.open(rendition_name(name, 1280, 'jpeg')) as f:
+        assert Image.open(f).size == (100, 100)
+
+
+def test_feed_uses_srcset(client, post_with_big_image):
+    content = client.get('/').content.decode()
+    name = post_with_big_image.image.name
+    for width in (320, 640, 1280):
+        url = default_storage.url(rendition_name(name, width, 'webp'))
+        assert f'{url} {width}w' in content
+    assert 'type="image/webp"' in content
+
+
+def test_build_renditions_command(post_with_big_image):
+    names = rendition_names(post_with_big_image.image.name)
+    for name in names:
+        default_storage.delete(name)
+    call_command('build_renditions', '--missing', stdout=StringIO())
+    assert all(default_storage.exists(name) for name in names)
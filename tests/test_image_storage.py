@@ -0,0 +1,186 @@
+import os
+import time
+from http import HTTPStatus
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import RequestFactory
+from PIL import Image
+
+from blog.images import process_image_jobs, rendition_names
+from blog.models import Post
+from blog.storage import is_content_addressed
+from blog.views import IMMUTABLE_CACHE_CONTROL, serve_media
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _image_file(color, name='photo.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', (64, 48), color=color).save(buffer, 'JPEG')
+    return ImageFile(buffer, name=name)
+
+
+def _blend_post(mixer, user, category, color, name='photo.jpg'):
+    return mixer.blend(
+        'blog.Post', author=user, category=category,
+        image=_image_file(color, name),
+    )
+
+
+@pytest.fixture
+def twin_posts(
+        mixer, user, another_user, published_category,
+        django_capture_on_commit_callbacks
+):
+    posts = [
+        _blend_post(mixer, user, published_category, (1, 2, 3), 'a.jpg'),
+        _blend_post(
+            mixer, another_user, published_category, (1, 2, 3), 'b.jpg'
+        ),
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        process_image_jobs()
+    for post in posts:
+        post.refresh_from_db()
+    return posts
+
+
+def _collect_images(*args):
+    call_command('collect_images', '--min-age', '0', *args, stdout=StringIO())
+
+
+def _files(root):
+    return sorted(
+        str(path.relative_to(root)) for path in root.rglob('*')
+        if path.is_file()
+    )
+
+
+def test_same_content_is_stored_once(twin_posts, media_root):
+    first, second = twin_posts
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые картинки хранятся одним файлом.'
+    )
+    assert is_content_addressed(first.image.name)
+    name = first.image.name
+    assert _files(media_root) == sorted([name, *rendition_names(name)]), (
+        'Убедитесь, что исходная загрузка удаляется после перекодирования.'
+    )
+
+
+def test_shared_file_outlives_one_post(
+        twin_posts, media_root, django_capture_on_commit_callbacks
+):
+    first, second = twin_posts
+    name = first.image.name
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert default_storage.exists(name)
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert _files(media_root) == [], (
+        'Убедитесь, что после удаления последней публикации её картинка '
+        'и уменьшенные копии удаляются.'
+    )
+
+
+def test_delete_view_collects_orphans(
+        user_client, twin_posts, media_root,
+        django_capture_on_commit_callbacks
+):
+    post = twin_posts[0]
+    twin_posts[1].delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(f'/posts/{post.id}/delete/')
+    assert response.status_code == HTTPStatus.FOUND
+    assert _files(media_root) == []
+
+
+def test_replaced_image_is_released(
+        mixer, user, published_category, media_root,
+        django_capture_on_commit_callbacks
+):
+    post = _blend_post(mixer, user, published_category, (9, 9, 9))
+    process_image_jobs()
+    post.refresh_from_db()
+    old_name = post.image.name
+    post.image = _image_file((200, 0, 0))
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    process_image_jobs()
+    assert not default_storage.exists(old_name)
+    assert not any(map(default_storage.exists, rendition_names(old_name)))
+
+
+def test_collect_images_rehashes_and_removes_orphans(
+        twin_posts, media_root
+):
+    default_storage.save('posts/leftover.jpg', _image_file((5, 5, 5)))
+    legacy = twin_posts[0]
+    with default_storage.open(legacy.image.name) as source:
+        legacy_name = default_storage.save('posts/legacy.jpg', source)
+    type(legacy).objects.filter(pk=legacy.pk).update(image=legacy_name)
+
+    _collect_images()
+    legacy.refresh_from_db()
+    assert legacy.image.name == twin_posts[1].image.name
+    name = legacy.image.name
+    assert _files(media_root) == sorted([name, *rendition_names(name)])
+
+
+def test_hashed_media_is_served_immutable(twin_posts, media_root):
+    request = RequestFactory().get('/media/')
+    response = serve_media(
+        request, twin_posts[0].image.name, document_root=media_root
+    )
+    assert response['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+
+    default_storage.save('plain.txt', StringIO('text'))
+    response = serve_media(request, 'plain.txt', document_root=media_root)
+    assert 'Cache-Control' not in response
+
+
+def test_file_saved_again_before_commit_is_kept(
+        twin_posts, media_root, django_capture_on_commit_callbacks
+):
+    first, second = twin_posts
+    name = first.image.name
+    second.delete()
+    storage = Post._meta.get_field('image').storage
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+        # Те же байты загружает другой запрос; его публикация ещё не
+        # сохранена, но файл уже обновлён.
+        os.utime(storage.path(name), (time.time() + 1, time.time() + 1))
+    assert storage.exists(name), (
+        'Убедитесь, что файл, сохранённый заново после удаления '
+        'публикации, не удаляется.'
+    )
+
+
+def test_recent_orphans_are_kept(twin_posts, media_root):
+    orphan = default_storage.save('posts/leftover.jpg', _image_file((5, 5, 5)))
+    call_command('collect_images', stdout=StringIO())
+    assert default_storage.exists(orphan), (
+        'Убедитесь, что уборка не удаляет только что сохранённые файлы.'
+    )
+
+
+@pytest.mark.parametrize('basename', ('a' * 64 + '.jpg', 'a' * 64 + '_x.jpg'))
+def test_client_name_does_not_change_storage_name(media_root, basename):
+    storage = Post._meta.get_field('image').storage
+    name = storage.save(f'posts/{basename}', _image_file((7, 7, 7)))
+    directory, hashed = name.split('/')[0], os.path.basename(name)
+    assert directory == 'posts'
+    assert len(os.path.splitext(hashed)[0]) == 64
+    assert hashed != basename
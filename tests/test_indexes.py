@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from blog import views
+from blog.models import Post
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='План запроса SQLite.'
+    ),
+]
+
+
+def _view_queryset(view_class, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def _assert_uses_index(queryset, index_name):
+    plan = queryset.explain()
+    assert f'USING INDEX {index_name}' in plan, (
+        f'Убедитесь, что запрос использует индекс `{index_name}`:\n{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        f'Убедитесь, что сортировка выполняется по индексу:\n{plan}'
+    )
+
+
+def test_index_view_uses_published_index():
+    _assert_uses_index(
+        _view_queryset(views.IndexView), 'post_published_pub_date_idx'
+    )
+
+
+def test_category_view_uses_category_index(published_category):
+    _assert_uses_index(
+        _view_queryset(
+            views.CategoryListView,
+            category_slug=published_category.slug,
+        ),
+        'post_category_pub_date_idx',
+    )
+
+
+def test_profile_view_uses_author_index(user):
+    _assert_uses_index(
+        _view_queryset(views.ProfileView, username=user.username),
+        'post_author_pub_date_idx',
+    )
+
+
+def test_post_comments_use_comment_index(post_with_published_location):
+    _assert_uses_index(
+        post_with_published_location.comments.select_related('author'),
+        'comment_post_created_at_idx',
+    )
+
+
+def test_publish_worker_uses_scheduled_index():
+    _assert_uses_index(
+        Post.objects.due().order_by('pub_date', 'id'),
+        'post_scheduled_pub_date_idx',
+    )
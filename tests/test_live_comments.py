@@ -0,0 +1,180 @@
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+
+from blog import live
+from blogicum.asgi import application
+
+
+def _scope(path, headers=()):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), *headers],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+
+
+def _parse_event(body):
+    fields = dict(
+        line.split(': ', 1) for line in body.decode().strip().split('\n')
+    )
+    return fields['event'], json.loads(fields['data'])
+
+
+def test_local_broker_delivers_across_threads():
+    broker = live.LocalBroker()
+
+    async def scenario():
+        subscription = broker.subscribe('channel')
+        assert broker.has_subscribers('channel')
+        publisher = threading.Thread(
+            target=broker.publish, args=('channel', {'event': 'created'})
+        )
+        publisher.start()
+        message = await subscription.get()
+        publisher.join()
+        broker.unsubscribe(subscription)
+        return message
+
+    message = async_to_sync(scenario)()
+    assert message['event'] == 'created'
+    assert message['event_id'] == 1
+    assert not broker.has_subscribers('channel')
+
+
+def test_slow_subscriber_gets_reset(monkeypatch):
+    broker = live.LocalBroker()
+    monkeypatch.setattr(broker, 'queue_size', 2)
+
+    async def scenario():
+        subscription = broker.subscribe('channel')
+        for _ in range(3):
+            broker.publish('channel', {'event': 'created'})
+        await subscription.get()
+        return await subscription.get()
+
+    assert async_to_sync(scenario)()['event'] == live.RESET
+    assert not broker.has_subscribers('channel')
+
+
+@pytest.mark.django_db
+def test_comment_events_are_unavailable_under_wsgi(
+        client, post_with_published_location
+):
+    response = client.get(
+        f'/posts/{post_with_published_location.id}/comments/events/'
+    )
+    assert response.status_code == HTTPStatus.NO_CONTENT
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_events_stream(
+        mixer, user, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    comment_id = comment.id
+
+    def edit_create_and_delete():
+        comment.text = 'Исправленный текст'
+        comment.save()
+        mixer.blend('blog.Comment', post=post, author=another_user)
+        comment.delete()
+
+    async def scenario():
+        communicator = ApplicationCommunicator(
+            application, _scope(f'/posts/{post.id}/comments/events/')
+        )
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        await communicator.receive_output(5)
+        await sync_to_async(edit_create_and_delete)()
+        events = [
+            _parse_event((await communicator.receive_output(5))['body'])
+            for _ in range(3)
+        ]
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(5)
+        return start, events
+
+    start, events = async_to_sync(scenario)()
+    assert start['status'] == HTTPStatus.OK
+    assert (b'content-type', b'text/event-stream') in start['headers']
+    assert [event for event, _ in events] == [
+        live.EDITED, live.CREATED, live.DELETED
+    ]
+    assert 'Исправленный текст' in events[0][1]['html']
+    assert f'comment-{comment_id}' in events[0][1]['html']
+    assert 'Отредактировать' not in events[0][1]['html']
+    assert events[2][1] == {'id': comment_id, 'html': ''}
+    assert not live.get_broker().has_subscribers(
+        live.comment_channel(post.id)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_events_for_hidden_post(mixer, user):
+    hidden = mixer.blend('blog.Post', author=user, is_published=False)
+
+    async def scenario():
+        communicator = ApplicationCommunicator(
+            application, _scope(f'/posts/{hidden.id}/comments/events/')
+        )
+        await communicator.send_input({'type': 'http.request'})
+        return await communicator.receive_output(5)
+
+    assert async_to_sync(scenario)()['status'] == HTTPStatus.NOT_FOUND
+
+
+def _response_start(scope):
+    async def scenario():
+        communicator = ApplicationCommunicator(application, scope)
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(5)
+        return start
+
+    return async_to_sync(scenario)()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_events_for_hidden_post_are_open_to_author(
+        client, mixer, user
+):
+    hidden = mixer.blend('blog.Post', author=user, is_published=False)
+    client.force_login(user)
+    cookie = f'sessionid={client.cookies["sessionid"].value}'.encode()
+    start = _response_start(_scope(
+        f'/posts/{hidden.id}/comments/events/', [(b'cookie', cookie)]
+    ))
+    assert start['status'] == HTTPStatus.OK, (
+        'Убедитесь, что автор может подписаться на комментарии своей '
+        'скрытой публикации, как и открыть её страницу.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_events_check_allowed_hosts(post_with_published_location):
+    scope = _scope(
+        f'/posts/{post_with_published_location.id}/comments/events/'
+    )
+    scope['headers'] = [(b'host', b'evil.example')]
+    assert _response_start(scope)['status'] == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_no_rendering_without_subscribers(
+        mixer, user, post_with_published_location, monkeypatch
+):
+    monkeypatch.setattr(
+        live, 'comment_event',
+        lambda *args: pytest.fail('Комментарий отрисован без подписчиков.')
+    )
+    mixer.blend('blog.Comment', post=post_with_published_location, author=user)
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _fetches(queries, table):
+    return [
+        q for q in queries
+        if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql']
+    ]
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        'blog.Comment', author=user, post=post_with_published_location
+    )
+
+
+@pytest.fixture
+def owner_urls(post_with_published_location, own_comment):
+    post_id = post_with_published_location.id
+    return {
+        'edit_post': f'/posts/{post_id}/edit/',
+        'delete_post': f'/posts/{post_id}/delete/',
+        'edit_comment': f'/posts/{post_id}/edit_comment/{own_comment.id}/',
+        'delete_comment': (
+            f'/posts/{post_id}/delete_comment/{own_comment.id}/'
+        ),
+    }
+
+
+# Сессия + пользователь + объект; форма публикации добавляет списки
+# категорий и местоположений.
+@pytest.mark.parametrize(('page', 'queries'), [
+    ('edit_post', 5),
+    ('delete_post', 3),
+    ('edit_comment', 3),
+    ('delete_comment', 3),
+])
+def test_owner_pages_get_query_count(
+        user_client, owner_urls, django_assert_num_queries, page, queries
+):
+    with django_assert_num_queries(queries) as ctx:
+        response = user_client.get(owner_urls[page])
+    assert response.status_code == HTTPStatus.OK
+    table = 'blog_post' if page.endswith('post') else 'blog_comment'
+    assert len(_fetches(ctx.captured_queries, table)) == 1, (
+        'Убедитесь, что объект загружается один раз за запрос.'
+    )
+
+
+# Сессия + пользователь + комментарий + запись комментария + обновление
+# версии публикации.
+@pytest.mark.parametrize(('page', 'queries'), [
+    ('edit_comment', 5),
+    ('delete_comment', 5),
+])
+def test_owner_pages_post_query_count(
+        user_client, owner_urls, django_assert_num_queries, page, queries
+):
+    with django_assert_num_queries(queries) as ctx:
+        response = user_client.post(
+            owner_urls[page], data={'text': 'Новый текст'}
+        )
+    assert response.status_code == HTTPStatus.FOUND
+    assert len(_fetches(ctx.captured_queries, 'blog_comment')) == 1
+
+
+# Сессия + пользователь + публикация + проверка формой категории и места
+# (выборка и проверка существования) + UPDATE + две операции над FTS-индексом
+# + ключи сбрасываемого кэша страниц (slug категории, имя автора).
+def test_edit_post_submit_fetches_post_once(
+        user_client, owner_urls, post_with_published_location,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    with django_assert_num_queries(12) as ctx:
+        response = user_client.post(owner_urls['edit_post'], data={
+            'title': 'Новый заголовок',
+            'text': post.text,
+            'pub_date': '2020-01-01T10:00',
+            'category': post.category_id,
+            'location': post.location_id,
+        })
+    assert response.status_code == HTTPStatus.FOUND
+    post_fetches = [
+        q for q in _fetches(ctx.captured_queries, 'blog_post')
+        if 'WHERE "blog_post"."id"' in q['sql']
+    ]
+    assert len(post_fetches) == 1
+
+
+# Сессия + пользователь + публикация + её комментарии (каскад) + ключи
+# кэша страниц + три DELETE + удаление из FTS-индекса.
+def test_delete_post_submit_fetches_post_once(
+        user_client, owner_urls, django_assert_num_queries
+):
+    with django_assert_num_queries(10) as ctx:
+        response = user_client.post(owner_urls['delete_post'])
+    assert response.status_code == HTTPStatus.FOUND
+    post_fetches = [
+        q for q in _fetches(ctx.captured_queries, 'blog_post')
+        if 'WHERE "blog_post"."id"' in q['sql']
+    ]
+    assert len(post_fetches) == 1
+
+
+def test_non_owner_is_redirected_without_refetch(
+        another_user_client, owner_urls, django_assert_num_queries
+):
+    with django_assert_num_queries(3):
+        response = another_user_client.get(owner_urls['edit_post'])
+    assert response.status_code == HTTPStatus.FOUND
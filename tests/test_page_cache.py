@@ -0,0 +1,179 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def shared_page_cache(settings, tmp_path):
+    location = str(tmp_path / 'cache')
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        },
+    }
+    settings.BLOG_PAGE_CACHE_ALIAS = 'shared'
+    yield location
+    caches['shared'].clear()
+
+
+def _assert_cached(client, url, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response.status_code == 200
+    return response
+
+
+def _assert_rendered(client, url, django_assert_max_num_queries):
+    with django_assert_max_num_queries(50) as ctx:
+        client.get(url)
+    assert ctx.captured_queries, (
+        f'Убедитесь, что кеш страницы `{url}` сбрасывается при изменениях.'
+    )
+
+
+def test_anonymous_feed_is_cached(
+        client, many_posts_with_published_locations,
+        django_assert_num_queries
+):
+    first = client.get('/')
+    second = _assert_cached(client, '/', django_assert_num_queries)
+    assert first.content == second.content
+
+
+def test_unread_query_params_share_cache_entry(
+        client, many_posts_with_published_locations,
+        django_assert_num_queries
+):
+    client.get('/?page=2&x=1')
+    for url in ('/?page=2&x=2', '/?x=3&page=2', '/?page=1&page=2'):
+        _assert_cached(client, url, django_assert_num_queries)
+    client.get('/')
+    _assert_cached(client, '/?utm_source=junk', django_assert_num_queries)
+
+
+def test_cursor_mode_has_own_cache_entry(
+        client, many_posts_with_published_locations,
+        django_assert_max_num_queries
+):
+    client.get('/')
+    _assert_rendered(client, '/?cursor=', django_assert_max_num_queries)
+
+
+def test_authenticated_feed_is_not_cached(
+        user_client, many_posts_with_published_locations,
+        django_assert_max_num_queries
+):
+    user_client.get('/')
+    _assert_rendered(user_client, '/', django_assert_max_num_queries)
+
+
+def test_comment_invalidates_only_pages_with_post(
+        client, mixer, many_posts_with_published_locations,
+        django_assert_num_queries, django_assert_max_num_queries
+):
+    client.get('/')
+    second_page = client.get('/?page=2')
+    post = second_page.context['page_obj'].object_list[0]
+    mixer.blend('blog.Comment', post=post)
+    _assert_cached(client, '/', django_assert_num_queries)
+    _assert_rendered(client, '/?page=2', django_assert_max_num_queries)
+
+
+def test_category_change_invalidates_category_and_index(
+        client, mixer, post_with_another_category, post_of_another_author,
+        another_category, django_assert_num_queries,
+        django_assert_max_num_queries
+):
+    unaffected = f'/category/{post_of_another_author.category.slug}/'
+    affected = f'/category/{another_category.slug}/'
+    for url in ('/', unaffected, affected):
+        client.get(url)
+    another_category.is_published = False
+    another_category.save()
+    _assert_cached(client, unaffected, django_assert_num_queries)
+    _assert_rendered(client, '/', django_assert_max_num_queries)
+    assert client.get(affected).status_code == 404
+
+
+def test_new_post_invalidates_author_profile(
+        client, mixer, user, published_category,
+        many_posts_with_published_locations
+):
+    client.get(f'/profile/{user.username}/')
+    new_post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now(),
+    )
+    response = client.get(f'/profile/{user.username}/')
+    assert new_post in response.context['page_obj'].object_list
+
+
+def test_scheduled_post_appears_when_published(
+        client, mixer, user, published_category, monkeypatch,
+        many_posts_with_published_locations, django_assert_num_queries
+):
+    scheduled = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert scheduled not in client.get('/').context['page_obj'].object_list
+
+    monkeypatch.setattr(
+        timezone, 'now',
+        lambda: scheduled.pub_date + timedelta(seconds=1),
+    )
+    _assert_cached(client, '/', django_assert_num_queries)
+    call_command('publish_scheduled', '--once')
+    response = client.get('/')
+    assert response.context is not None, (
+        'Убедитесь, что показ отложенной публикации сбрасывает кеш ленты.'
+    )
+    assert scheduled in response.context['page_obj'].object_list
+
+
+def test_process_cache_is_rejected_for_many_processes(
+        settings, shared_page_cache
+):
+    settings.BLOG_SERVER_PROCESSES = 2
+    cache.check_page_cache()
+    settings.BLOG_PAGE_CACHE_ALIAS = 'default'
+    with pytest.raises(ImproperlyConfigured):
+        cache.check_page_cache()
+
+
+def test_post_change_in_other_process_invalidates_page(
+        client, shared_page_cache, post_with_published_location,
+        django_assert_num_queries, django_assert_max_num_queries
+):
+    client.get('/')
+    _assert_cached(client, '/', django_assert_num_queries)
+    # Публикацию правит другой процесс: у него свой объект кеша.
+    other_process = FileBasedCache(shared_page_cache, {})
+    other_process.incr(
+        cache._post_version_key(post_with_published_location.id)
+    )
+    _assert_rendered(client, '/', django_assert_max_num_queries)
+
+
+def test_pages_sharing_post_are_all_invalidated(
+        client, many_posts_with_published_locations,
+        django_assert_max_num_queries
+):
+    post = client.get('/').context['page_obj'].object_list[0]
+    urls = ('/', f'/profile/{post.author.username}/', '/?cursor=')
+    for url in urls[1:]:
+        client.get(url)
+    cache.invalidate_post_pages([post.id])
+    for url in urls:
+        _assert_rendered(client, url, django_assert_max_num_queries)
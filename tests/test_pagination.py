@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.pagination import BACKWARD, FORWARD, encode_cursor
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _page_ids(response):
+    return [post.id for post in response.context['page_obj'].object_list]
+
+
+def test_cursor_pagination_walks_feed(
+        client, many_posts_with_published_locations
+):
+    expected_ids = [
+        post.id for post in sorted(
+            many_posts_with_published_locations,
+            key=lambda post: (post.pub_date, post.id),
+            reverse=True,
+        )
+    ]
+    with CaptureQueriesContext(connection) as ctx:
+        first = client.get('/?cursor=')
+    assert first.status_code == HTTPStatus.OK
+    assert not any('COUNT(*)' in q['sql'] for q in ctx.captured_queries), (
+        'Убедитесь, что в режиме курсорной пагинации не выполняется '
+        'запрос COUNT(*).'
+    )
+    assert _page_ids(first) == expected_ids[:N_PER_PAGE]
+    assert not first.context['page_obj'].has_previous()
+
+    next_cursor = first.context['page_obj'].next_cursor
+    second = client.get(f'/?cursor={next_cursor}')
+    assert _page_ids(second) == expected_ids[N_PER_PAGE:N_PER_PAGE * 2]
+    assert not second.context['page_obj'].has_next()
+    assert second.context['page_obj'].has_previous()
+
+    previous_cursor = second.context['page_obj'].previous_cursor
+    back = client.get(f'/?cursor={previous_cursor}')
+    assert _page_ids(back) == expected_ids[:N_PER_PAGE]
+
+
+def test_cursor_pagination_links(
+        client, many_posts_with_published_locations
+):
+    response = client.get('/?cursor=')
+    next_cursor = response.context['page_obj'].next_cursor
+    assert f'?cursor={next_cursor}' in response.content.decode('utf-8')
+
+
+def test_invalid_cursor_returns_404(client):
+    response = client.get('/?cursor=not-a-cursor')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('values', [
+    ['не дата', 1],
+    ['2020-01-01T00:00:00+00:00', 'abc'],
+    [5, 1],
+    [None, 1],
+    ['2020-01-01T00:00:00+00:00', [1]],
+    ['2020-01-01T00:00:00+00:00'],
+])
+def test_mistyped_cursor_returns_404(
+        client, many_posts_with_published_locations, values
+):
+    for direction in (FORWARD, BACKWARD):
+        cursor = encode_cursor(values, direction)
+        response = client.get('/', {'cursor': cursor})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Убедитесь, что курсор со значениями не тех типов приводит '
+            'к ответу 404, а не к ошибке сервера.'
+        )
+
+
+def test_offset_pagination_is_default(
+        client, many_posts_with_published_locations
+):
+    response = client.get('/?page=2')
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['page_obj'].number == 2
+    assert not response.context['cursor_paginated']
+
+
+def test_offset_pages_link_to_cursor_after_limit(
+        client, many_posts_with_published_locations, monkeypatch
+):
+    from blog.views import IndexView
+
+    monkeypatch.setattr(IndexView, 'cursor_after_page', 1)
+    first = client.get('/')
+    next_cursor = first.context['next_cursor']
+    content = first.content.decode('utf-8')
+    assert f'?cursor={next_cursor}' in content
+    assert '?page=2' not in content, (
+        'Убедитесь, что страницы после `cursor_after_page` не открываются '
+        'по номеру (через OFFSET).'
+    )
+    second = client.get('/', {'cursor': next_cursor})
+    assert _page_ids(second) == _page_ids(client.get('/?page=2'))
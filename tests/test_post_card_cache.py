@@ -0,0 +1,68 @@
+import pytest
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from blog.models import Category, Post
+from blog.references import get_references
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _card_key(post):
+    post.refresh_from_db()
+    return make_template_fragment_key('post_card', [
+        post.id, post.updated_at, get_references().fingerprint,
+    ])
+
+
+def test_post_card_is_cached_by_version(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+    assert cache.get(_card_key(post)) is not None, (
+        'Убедитесь, что карточка публикации кешируется.'
+    )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert cache.get(_card_key(post)) is None
+    assert 'Новый заголовок' in user_client.get('/').content.decode()
+
+
+def test_post_card_reflects_comments_and_category(
+        user_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+    mixer.blend('blog.Comment', post=post)
+    assert 'Комментарии (1)' in user_client.get('/').content.decode(), (
+        'Убедитесь, что новый комментарий меняет версию карточки.'
+    )
+
+    post.category.title = 'Переименованная категория'
+    post.category.save()
+    assert 'Переименованная категория' in (
+        user_client.get('/').content.decode()
+    )
+
+
+def test_post_card_follows_reloaded_references(
+        settings, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+    # Категорию переименовал другой процесс: справочники этого процесса
+    # ещё старые, а карточка уже перерисовывается с новым updated_at.
+    Category.objects.filter(pk=post.category_id).update(
+        title='Переименованная категория'
+    )
+    Post.objects.filter(pk=post.pk).touch()
+    user_client.get('/')
+    settings.BLOG_REFERENCES_LOCAL_TIMEOUT = 0
+    assert 'Переименованная категория' in (
+        user_client.get('/').content.decode()
+    ), (
+        'Убедитесь, что карточка перерисовывается, когда процесс '
+        'перечитывает справочники.'
+    )
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(7).blend(
+        'blog.Comment', post=post_with_published_location
+    )
+
+
+def test_detail_loads_post_with_relations(
+        client, post_with_published_location, many_comments,
+        django_assert_num_queries
+):
+    # Публикация вместе с автором, категорией и местоположением + одна
+    # порция комментариев с авторами.
+    with django_assert_num_queries(2):
+        response = client.get(f'/posts/{post_with_published_location.id}/')
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_detail_comments_are_loaded_in_batches(
+        client, monkeypatch, post_with_published_location, many_comments
+):
+    from blog.views import VisiblePostMixin
+
+    monkeypatch.setattr(VisiblePostMixin, 'comments_per_page', 3)
+    post_id = post_with_published_location.id
+    expected = [comment.id for comment in sorted(
+        many_comments, key=lambda comment: (comment.created_at, comment.id)
+    )]
+
+    response = client.get(f'/posts/{post_id}/')
+    page = response.context['comments_page']
+    loaded = [comment.id for comment in page.object_list]
+    assert loaded == expected[:3]
+    assert f'/posts/{post_id}/comments/?cursor=' in response.content.decode()
+
+    while page.has_next():
+        response = client.get(
+            f'/posts/{post_id}/comments/?cursor={page.next_cursor}'
+        )
+        assert response.status_code == HTTPStatus.OK
+        page = response.context['comments_page']
+        loaded += [comment.id for comment in page.object_list]
+    assert loaded == expected
+
+
+def test_comments_endpoint_respects_post_visibility(
+        client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(
+        f'/posts/{post.id}/comments/'
+    ).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(
+        f'/posts/{post.id}/comments/'
+    ).status_code == HTTPStatus.OK
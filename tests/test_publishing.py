@@ -0,0 +1,111 @@
+import json
+from io import StringIO
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import serializers
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.management.commands.publish_scheduled import Command
+from blog.models import Post, Visibility
+from blog.publishing import next_publication, publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def test_visibility_follows_flag_and_date(scheduled_post):
+    assert scheduled_post.visibility == Visibility.SCHEDULED
+    scheduled_post.is_published = False
+    scheduled_post.save(update_fields=('is_published',))
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.visibility == Visibility.HIDDEN
+    scheduled_post.is_published = True
+    scheduled_post.pub_date = timezone.now() - timedelta(minutes=1)
+    scheduled_post.save()
+    assert Post.objects.published().filter(pk=scheduled_post.pk).exists()
+
+
+def test_due_post_is_shown_without_worker(
+        client, scheduled_post, monkeypatch
+):
+    monkeypatch.setattr(
+        timezone, 'now',
+        lambda: scheduled_post.pub_date + timedelta(seconds=1),
+    )
+    assert Post.objects.published().filter(pk=scheduled_post.pk).exists(), (
+        'Убедитесь, что публикация показывается, как только наступила её '
+        'дата, даже если `publish_scheduled` ещё не отработал.'
+    )
+    response = client.get(f'/posts/{scheduled_post.id}/')
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_worker_reads_only_scheduled_posts():
+    where = str(Post.objects.due().query).split(' WHERE ')[1]
+    assert 'is_published' not in where
+    assert f'"visibility" = {Visibility.SCHEDULED}' in where
+
+
+def test_publish_due_posts(
+        client, scheduled_post, monkeypatch
+):
+    url = f'/posts/{scheduled_post.id}/'
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert publish_due_posts() == 0
+    assert next_publication() == scheduled_post.pub_date
+
+    monkeypatch.setattr(
+        timezone, 'now',
+        lambda: scheduled_post.pub_date + timedelta(seconds=1),
+    )
+    assert publish_due_posts() == 1
+    published = Post.objects.get(pk=scheduled_post.pk)
+    assert published.visibility == Visibility.VISIBLE
+    assert published.updated_at > scheduled_post.updated_at
+    assert client.get(url).status_code == HTTPStatus.OK
+    assert next_publication() is None
+
+
+def test_worker_sleeps_until_next_publication(scheduled_post):
+    command = Command()
+    assert 3500 < command.sleep_seconds(max_sleep=86400) <= 3600
+    assert command.sleep_seconds(max_sleep=60) == 60
+
+
+def test_recompute_visibility_fixes_rows_written_around_save(
+        user, published_category, scheduled_post
+):
+    rows = [{
+        'model': 'blog.post', 'pk': 1000 + number,
+        'fields': {
+            'title': f'Из фикстуры {number}', 'text': 'Текст',
+            'pub_date': '2022-12-18T23:06:18Z',
+            'created_at': '2022-12-18T23:06:18Z',
+            'updated_at': '2022-12-18T23:06:18Z', 'author': user.pk,
+            'category': published_category.pk, 'is_published': True,
+        },
+    } for number in range(3)]
+    for obj in serializers.deserialize('json', json.dumps(rows)):
+        obj.save()
+    Post.objects.filter(pk=scheduled_post.pk).update(is_published=False)
+    assert not Post.objects.published().exists()
+
+    call_command('recompute_visibility', stdout=StringIO())
+
+    assert set(
+        Post.objects.published().values_list('pk', flat=True)
+    ) == {1000, 1001, 1002}
+    assert Post.objects.get(
+        pk=scheduled_post.pk
+    ).visibility == Visibility.HIDDEN
+    assert not Post.objects.stale_visibility().exists()
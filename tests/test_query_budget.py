@@ -0,0 +1,94 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        'blog.Comment', author=user, post=post_with_published_location
+    )
+
+
+@pytest.fixture
+def budget_urls(
+        user, published_category, post_with_published_location, own_comment,
+        many_posts_with_published_locations
+):
+    post_id = post_with_published_location.id
+    return [
+        '/',
+        '/?page=2',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{post_id}/',
+        f'/posts/{post_id}/comments/',
+        '/posts/create/',
+        f'/posts/{post_id}/edit/',
+        f'/posts/{post_id}/delete/',
+        f'/posts/{post_id}/edit_comment/{own_comment.id}/',
+        f'/posts/{post_id}/delete_comment/{own_comment.id}/',
+        '/search/?q=текст',
+        '/feed/',
+        '/feed/atom/',
+        f'/category/{published_category.slug}/feed/',
+        f'/profile/{user.username}/feed/atom/',
+        '/api/posts/?limit=100',
+        f'/api/posts/{post_id}/',
+        f'/api/posts/{post_id}/comments/',
+        '/api/categories/',
+        f'/api/categories/{published_category.slug}/posts/',
+        f'/api/profile/{user.username}/posts/',
+        '/sitemap.xml',
+        '/sitemap-posts-0.xml',
+        '/pages/about/',
+        '/pages/rules/',
+    ]
+
+
+def test_pages_fit_query_budget(
+        client, user_client, budget_urls, assert_query_budget
+):
+    for url in budget_urls:
+        assert_query_budget(user_client, url)
+        assert_query_budget(client, url)
+
+
+def test_comment_submit_fits_query_budget(
+        user_client, post_with_published_location, assert_query_budget
+):
+    assert_query_budget(
+        user_client,
+        f'/posts/{post_with_published_location.id}/comment/',
+        method='post',
+        data={'text': 'Комментарий'},
+    )
+
+
+def test_budget_overrun_is_logged(client, caplog):
+    with override_settings(QUERY_BUDGETS={'blog:index': 0}):
+        with caplog.at_level(logging.WARNING, logger='blog.middleware'):
+            client.get('/')
+    assert 'blog:index' in caplog.text, (
+        'Убедитесь, что превышение бюджета SQL-запросов пишется в лог.'
+    )
+
+
+def test_unwatched_views_are_not_logged(user_client, caplog):
+    with override_settings(QUERY_BUDGET_DEFAULT=0):
+        with caplog.at_level(logging.WARNING, logger='blog.middleware'):
+            response = user_client.get('/auth/password_change/')
+    assert response.wsgi_request.query_stats.count > 0
+    assert not caplog.text
+
+
+def test_budget_checks_are_off_in_production(client):
+    with override_settings(DEBUG=False, QUERY_BUDGET_CHECKS=False):
+        response = client.get('/')
+    assert not hasattr(response.wsgi_request, 'query_stats'), (
+        'Убедитесь, что без DEBUG и QUERY_BUDGET_CHECKS учёт SQL-запросов '
+        'не подключается.'
+    )
@@ -0,0 +1,43 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def list_urls(user, published_category):
+    return {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }
+
+
+# Аноним, промах кеша: COUNT(*) + страница. Профиль добавляет ровно один
+# запрос за пользователем, сколько бы раз он ни понадобился представлению;
+# категория и места берутся из справочников процесса.
+@pytest.mark.parametrize(('page', 'queries'), [
+    ('index', 2),
+    ('category', 2),
+    ('profile', 3),
+])
+def test_anonymous_list_query_count(
+        client, list_urls, many_posts_with_published_locations,
+        django_assert_num_queries, page, queries
+):
+    with django_assert_num_queries(queries):
+        client.get(list_urls[page])
+
+
+# Пользователь: сессия + пользователь + COUNT(*) + страница; страницы
+# для пользователей не кешируются.
+@pytest.mark.parametrize(('page', 'queries'), [
+    ('index', 4),
+    ('category', 4),
+    ('profile', 5),
+])
+def test_authenticated_list_query_count(
+        user_client, list_urls, many_posts_with_published_locations,
+        django_assert_num_queries, page, queries
+):
+    with django_assert_num_queries(queries):
+        user_client.get(list_urls[page])
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.utils import timezone
+
+from blog import cache
+from blog.models import Post
+
+# Backup API ждёт, пока на основной базе нет незавершённой записи:
+# тесты работают без обёртки в транзакцию.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """Вторая SQLite-база, которую догоняет ``sync_replicas``."""
+    connections.databases[REPLICA] = {
+        **connections.databases['default'],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+        'TEST': {'NAME': str(tmp_path / 'replica.sqlite3')},
+    }
+    settings.BLOG_READ_DATABASES = (REPLICA,)
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+def test_list_reads_come_from_replica(
+        client, replica, post_with_published_location, mixer
+):
+    call_command('sync_replicas')
+    post = post_with_published_location
+    # Запись после копирования реплика ещё не видит.
+    unreplicated = mixer.blend(
+        'blog.Post', author=post.author, category=post.category,
+        pub_date=timezone.now(),
+    )
+    response = client.get(f'/profile/{post.author.username}/')
+    posts = response.context['page_obj'].object_list
+    assert post in posts
+    assert unreplicated not in posts
+    assert {p._state.db for p in posts} == {REPLICA}
+
+    call_command('sync_replicas')
+    response = client.get(f'/posts/{unreplicated.id}/')
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['post']._state.db == REPLICA
+
+
+def test_writes_go_to_primary_and_reads_stick(
+        user_client, client, replica, published_category, published_location
+):
+    call_command('sync_replicas')
+    response = user_client.post('/posts/create/', data={
+        'title': 'Свежая публикация',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T10:00',
+        'category': published_category.id,
+        'location': published_location.id,
+    })
+    assert response.status_code == HTTPStatus.FOUND
+    assert Post.objects.using('default').filter(
+        title='Свежая публикация'
+    ).exists()
+    assert not Post.objects.using(REPLICA).filter(
+        title='Свежая публикация'
+    ).exists()
+    assert response.cookies['blog_read_primary']['max-age'] == 10
+
+    profile = user_client.get(response['Location'])
+    titles = [post.title for post in profile.context['page_obj']]
+    assert 'Свежая публикация' in titles
+    # Другие читатели видят реплику, пока она не догонит основную базу.
+    profile = client.get(response['Location'])
+    titles = [post.title for post in profile.context['page_obj']]
+    assert 'Свежая публикация' not in titles
+
+
+def test_write_views_read_from_primary(
+        user_client, replica, post_with_published_location
+):
+    call_command('sync_replicas')
+    response = user_client.get(
+        f'/posts/{post_with_published_location.id}/edit/'
+    )
+    assert response.context['form'].instance._state.db == 'default'
+
+
+def test_no_replicas_reads_from_primary(
+        client, post_with_published_location
+):
+    response = client.get(f'/posts/{post_with_published_location.id}/')
+    assert response.context['post']._state.db == 'default'
+
+
+def test_replica_pages_are_cached_briefly(
+        client, replica, post_with_published_location, monkeypatch
+):
+    call_command('sync_replicas')
+    page_cache = cache.page_cache()
+    timeouts = []
+    store = page_cache.set
+
+    def set_page(key, value, timeout=None, **kwargs):
+        if key.startswith('blog:page:'):
+            timeouts.append(timeout)
+        return store(key, value, timeout, **kwargs)
+
+    monkeypatch.setattr(page_cache, 'set', set_page)
+    client.get('/')
+    assert timeouts == [10]
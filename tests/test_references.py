@@ -0,0 +1,119 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from blog import references
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_list_query_has_no_reference_joins(
+        client, many_posts_with_published_locations
+):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get('/')
+    assert response.status_code == HTTPStatus.OK
+    page_query = context.captured_queries[-1]['sql']
+    assert 'JOIN "blog_location"' not in page_query
+    assert '"blog_category"."title"' not in page_query
+
+
+def test_listed_posts_share_reference_objects(
+        published_category, many_posts_with_published_locations,
+        django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        posts = list(Post.objects.for_list())
+        for post in posts:
+            assert post.category.is_published
+            assert post.location.name
+    assert posts[0].category is posts[1].category
+
+
+def test_warm_references_need_no_queries(
+        published_category, django_assert_num_queries
+):
+    references.get_references()
+    with django_assert_num_queries(0):
+        found = references.get_references().published_category(
+            published_category.slug
+        )
+    assert found == published_category
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        },
+    }
+    settings.BLOG_REFERENCES_CACHE_ALIAS = 'shared'
+    return caches['shared']
+
+
+def test_new_shared_version_reloads_references(
+        shared_cache, published_category
+):
+    stale = references.get_references()
+    assert references.get_references() is stale
+    # Справочник изменил другой процесс.
+    shared_cache.set(references.VERSION_KEY, 'other', None)
+    with CaptureQueriesContext(connection) as context:
+        fresh = references.get_references()
+    assert len(context.captured_queries) == 2
+    assert fresh is not stale
+    assert fresh.version == 'other'
+
+
+def test_process_cache_copy_expires(published_category, settings):
+    stale = references.get_references()
+    assert references.get_references() is stale
+    settings.BLOG_REFERENCES_LOCAL_TIMEOUT = 0
+    assert references.get_references() is not stale
+
+
+def test_category_changes_reach_pages(client, published_category):
+    url = f'/category/{published_category.slug}/'
+    published_category.title = 'Новое название'
+    published_category.save()
+    assert 'Новое название' in client.get(url).content.decode()
+
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_location_rename_reaches_post_cards(
+        client, post_with_published_location, published_location
+):
+    published_location.name = 'Новое место'
+    published_location.save()
+    assert 'Новое место' in client.get('/').content.decode()
+
+
+def test_unknown_reference_is_loaded_by_query(
+        monkeypatch, post_with_published_location
+):
+    monkeypatch.setattr(references, '_references', references.References(
+        references.get_references().version, [], []
+    ))
+    post = Post.objects.for_list().get()
+    assert post.location == post_with_published_location.location
+
+
+def test_rolled_back_category_is_not_kept():
+    references.get_references()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            Category.objects.create(
+                title='Призрак', description='-', slug='ghost'
+            )
+            raise RuntimeError
+    assert references.get_references().published_category('ghost') is None
@@ -0,0 +1,132 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.search import (
+    FTS5SearchBackend, SubstringSearchBackend, get_search_backend
+)
+from conftest import N_PER_PAGE, warm_references
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        kwargs.setdefault('is_published', True)
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title=title, text=text, **kwargs
+        )
+
+    return blend
+
+
+@pytest.fixture
+def search_posts(blend_post):
+    blend = blend_post
+    return {
+        'title': blend('Кошки и собаки', 'Про домашних животных.'),
+        'text': blend('Заметка', 'В тексте один раз упомянуты кошки.'),
+        'other': blend('Погода', 'Сегодня дождь.'),
+        'hidden': blend('Кошки', 'Черновик.', is_published=False),
+    }
+
+
+def _result_ids(response):
+    return [post.id for post in response.context['page_obj'].object_list]
+
+
+def test_search_finds_ranked_published_posts(client, search_posts):
+    response = client.get('/search/', {'q': 'кошки'})
+    assert response.status_code == HTTPStatus.OK
+    assert _result_ids(response) == [
+        search_posts['title'].id, search_posts['text'].id
+    ], (
+        'Убедитесь, что поиск находит только опубликованные записи и '
+        'ставит выше совпадения в заголовке.'
+    )
+
+
+def test_search_highlights_snippet(client, search_posts):
+    content = client.get('/search/', {'q': 'упомянуты'}).content.decode()
+    assert '<mark>упомянуты</mark>' in content
+
+
+def test_search_snippet_is_escaped(client, blend_post):
+    blend_post('x', '<script>alert(1)</script> слово')
+    content = client.get('/search/', {'q': 'слово'}).content.decode()
+    assert '<script>alert' not in content
+    assert '<mark>слово</mark>' in content
+
+
+def test_search_matches_prefix_and_ignores_syntax(client, search_posts):
+    response = client.get('/search/', {'q': 'дожд" OR NEAR('})
+    assert response.status_code == HTTPStatus.OK
+    assert _result_ids(response) == []
+    response = client.get('/search/', {'q': 'дожд'})
+    assert _result_ids(response) == [search_posts['other'].id]
+
+
+def test_index_follows_edits_and_deletes(client, search_posts):
+    post = search_posts['other']
+    post.text = 'Теперь солнце.'
+    post.save()
+    assert _result_ids(client.get('/search/', {'q': 'дождь'})) == []
+    assert _result_ids(client.get('/search/', {'q': 'солнце'})) == [post.id]
+    post.delete()
+    assert _result_ids(client.get('/search/', {'q': 'солнце'})) == []
+
+
+def test_search_is_paginated(client, blend_post):
+    for number in range(N_PER_PAGE + 5):
+        blend_post(f'Отчёт {number}', 'Ежемесячный отчёт.')
+    warm_references()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/search/', {'q': 'отчёт'})
+    assert len(ctx.captured_queries) == 2, (
+        'Убедитесь, что страница поиска выполняет два запроса: '
+        'подсчёт результатов и выборку страницы.'
+    )
+    assert len(response.context['page_obj'].object_list) == N_PER_PAGE
+    assert '?q=%D0%BE%D1%82%D1%87%D1%91%D1%82&amp;page=2' in (
+        response.content.decode()
+    )
+    response = client.get('/search/', {'q': 'отчёт', 'page': 2})
+    assert len(response.context['page_obj'].object_list) == 5
+
+
+def test_rebuild_command(client, search_posts):
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_fts')
+    assert _result_ids(client.get('/search/', {'q': 'дождь'})) == []
+    call_command('rebuild_search_index', stdout=StringIO())
+    assert _result_ids(client.get('/search/', {'q': 'дождь'})) == [
+        search_posts['other'].id
+    ]
+
+
+def test_empty_query_runs_no_search(client, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        response = client.get('/search/')
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_substring_backend(settings, client, search_posts):
+    settings.BLOG_SEARCH_BACKEND = 'blog.search.SubstringSearchBackend'
+    response = client.get('/search/', {'q': 'дождь'})
+    assert _result_ids(response) == [search_posts['other'].id]
+    assert '<mark>дождь</mark>' in response.content.decode()
+
+
+def test_default_backend_is_fts5_on_sqlite(settings):
+    assert isinstance(get_search_backend(), FTS5SearchBackend)
+    settings.BLOG_SEARCH_BACKEND = 'blog.search.SubstringSearchBackend'
+    assert isinstance(get_search_backend(), SubstringSearchBackend)
@@ -0,0 +1,120 @@
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+import pytest
+from django.core.management import call_command
+
+from blog import sitemaps
+
+pytestmark = [pytest.mark.django_db]
+
+NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+def _locations(content):
+    root = ElementTree.fromstring(content)
+    return [loc.text for loc in root.iter(f'{NS}loc')]
+
+
+def _read(response):
+    return b''.join(response.streaming_content)
+
+
+def test_sitemap_index_lists_sections(
+        client, post_with_published_location, django_assert_num_queries
+):
+    response = client.get('/sitemap.xml')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'] == 'application/xml'
+    assert response.streaming
+    with django_assert_num_queries(3):
+        content = _read(response)
+    assert _locations(content) == [
+        'http://testserver/sitemap-posts-0.xml',
+        'http://testserver/sitemap-categories-0.xml',
+        'http://testserver/sitemap-profiles-0.xml',
+    ]
+    root = ElementTree.fromstring(content)
+    lastmod = root.find(f'{NS}sitemap/{NS}lastmod').text
+    assert lastmod == post_with_published_location.updated_at.isoformat(
+        timespec='seconds'
+    )
+
+
+def test_post_sitemap_skips_hidden_posts(
+        client, post_with_published_location, mixer
+):
+    post = post_with_published_location
+    hidden = mixer.blend(
+        'blog.Post', author=post.author, category=post.category,
+        is_published=False,
+    )
+    locations = _locations(_read(client.get('/sitemap-posts-0.xml')))
+    assert f'http://testserver/posts/{post.id}/' in locations
+    assert f'http://testserver/posts/{hidden.id}/' not in locations
+
+
+def test_category_and_profile_sitemaps(client, post_with_published_location):
+    post = post_with_published_location
+    categories = _locations(_read(client.get('/sitemap-categories-0.xml')))
+    profiles = _locations(_read(client.get('/sitemap-profiles-0.xml')))
+    assert categories == [
+        f'http://testserver/category/{post.category.slug}/'
+    ]
+    assert profiles == [f'http://testserver/profile/{post.author.username}/']
+
+
+def test_sitemap_chunks_by_id_range(
+        client, many_posts_with_published_locations, monkeypatch
+):
+    monkeypatch.setattr(sitemaps, 'CHUNK_SIZE', 5)
+    post_ids = sorted(post.id for post in many_posts_with_published_locations)
+    chunk_locations = [
+        location for location in _locations(_read(client.get('/sitemap.xml')))
+        if 'sitemap-posts-' in location
+    ]
+    assert len(chunk_locations) == len({pk // 5 for pk in post_ids})
+    listed = []
+    for location in chunk_locations:
+        path = location.replace('http://testserver', '')
+        listed += _locations(_read(client.get(path)))
+    assert listed == [f'http://testserver/posts/{pk}/' for pk in post_ids]
+
+
+def test_sitemap_index_is_cached_until_feed_changes(
+        client, post_with_published_location, django_assert_num_queries,
+        monkeypatch
+):
+    monkeypatch.setattr(sitemaps, 'CHUNK_SIZE', 1)
+    post = post_with_published_location
+    before = _locations(_read(client.get('/sitemap.xml')))
+    with django_assert_num_queries(0):
+        assert _locations(_read(client.get('/sitemap.xml'))) == before
+
+    post.is_published = False
+    post.save()
+    after = _locations(_read(client.get('/sitemap.xml')))
+    assert f'http://testserver/sitemap-posts-{post.id}.xml' in before
+    assert f'http://testserver/sitemap-posts-{post.id}.xml' not in after, (
+        'Убедитесь, что скрытая публикация убирает кусок из '
+        'закешированного индекса карты сайта.'
+    )
+
+
+def test_unknown_section_is_404(client):
+    response = client.get('/sitemap-missing-0.xml')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_generate_sitemaps_command(tmp_path, post_with_published_location):
+    call_command(
+        'generate_sitemaps', str(tmp_path),
+        base_url='https://blogicum.example/',
+    )
+    assert _locations((tmp_path / 'sitemap.xml').read_bytes())[0] == (
+        'https://blogicum.example/sitemap-posts-0.xml'
+    )
+    assert _locations((tmp_path / 'sitemap-posts-0.xml').read_bytes()) == [
+        f'https://blogicum.example/posts/{post_with_published_location.id}/'
+    ]
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,62 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from blog.sqlite import pragma_statements
+
+
+def pragma(database, name):
+    with database.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def file_database(tmp_path):
+    database = DatabaseWrapper(
+        {**connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')},
+        alias='pragma_test',
+    )
+    yield database
+    database.close()
+
+
+@pytest.mark.django_db
+def test_file_database_is_tuned(file_database, settings):
+    settings.BLOG_SQLITE_PRAGMAS = {
+        'busy_timeout': 2500,
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'cache_size': -1024,
+        'mmap_size': 1024 * 1024,
+    }
+    assert pragma(file_database, 'journal_mode') == 'wal'
+    assert pragma(file_database, 'synchronous') == 1
+    assert pragma(file_database, 'busy_timeout') == 2500
+    assert pragma(file_database, 'cache_size') == -1024
+    assert pragma(file_database, 'mmap_size') == 1024 * 1024
+
+
+@pytest.mark.django_db
+def test_pragmas_are_not_counted_as_page_queries(
+        file_database, django_assert_num_queries
+):
+    with django_assert_num_queries(0, connection=file_database):
+        file_database.ensure_connection()
+    assert pragma(file_database, 'journal_mode') == 'wal'
+
+
+@pytest.mark.django_db
+def test_empty_profile_keeps_sqlite_defaults(file_database, settings):
+    settings.BLOG_SQLITE_PRAGMAS = {}
+    assert pragma(file_database, 'journal_mode') == 'delete'
+
+
+@pytest.mark.parametrize('pragmas', [
+    {'journal_mode': 'wal; DROP TABLE blog_post'},
+    {'user_version = 1; --': 1},
+])
+def test_unsafe_pragmas_are_rejected(pragmas):
+    with pytest.raises(ImproperlyConfigured):
+        pragma_statements(pragmas)